@@ -0,0 +1,67 @@
+# AGMA evaluation of aligned pinion/gear pairs: scalar agma loop, NumPy
+# batch and the compiled kernel of gears.kernels (when Numba is installed)
+#   python -m benchmarks.agma_kernels --pairs 100000 --index 4
+import argparse
+import time
+import numpy as np
+
+import gears.agma as ag
+from gears.kernels import kernel_safety, numba
+from models.gear_catalog import as_catalog
+from data.synthetic import synthetic_catalog
+
+dtire = 0.499
+Sc = 1895
+St = 515
+Tmotor = 172
+nmin = 110*1000/60*(1/(np.pi*dtire))
+R = 0.41
+
+def best_time(f, repeat):
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    f()
+    times.append(time.perf_counter() - start)
+  return min(times)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--pairs', type=int, default=100000)
+  parser.add_argument('--index', type=int, default=4)
+  parser.add_argument('--scalar', type=int, default=5000, help='pairs timed with the scalar loop')
+  parser.add_argument('--repeat', type=int, default=3)
+  args = parser.parse_args()
+
+  pinions, gears = synthetic_catalog(1000)
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  rng = np.random.default_rng(0)
+  pairp = pinions[rng.integers(0, len(pinions), args.pairs)]
+  pairg = gears[rng.integers(0, len(gears), args.pairs)]
+
+  # Scalar loop, extrapolated from the first pairs
+  count = min(args.scalar, args.pairs)
+  scalar = best_time(lambda: [
+    ag.agma(R, pairp[j], pairg[j], nmin, Tmotor, St, Sc, args.index) for j in range(count)], 1)
+  scalar = scalar*args.pairs/count
+  print("scalar agma: ", round(scalar, 4), "s, ", round(args.pairs/scalar), "pairs/s")
+
+  numpy_time = best_time(lambda: kernel_safety(R, pairp, pairg, nmin, Tmotor, St, Sc, args.index, backend='numpy'), args.repeat)
+  print("numpy batch: ", round(numpy_time, 4), "s, ", round(args.pairs/numpy_time), "pairs/s, speedup ", round(scalar/numpy_time, 1))
+
+  if (numba is None):
+    print("numba kernel: numba is not installed")
+  else:
+    # First call compiles the kernel
+    start = time.perf_counter()
+    kernel_safety(R, pairp[:1], pairg[:1], nmin, Tmotor, St, Sc, args.index, backend='numba')
+    print("numba compile: ", round(time.perf_counter() - start, 3), "s")
+
+    numba_time = best_time(lambda: kernel_safety(R, pairp, pairg, nmin, Tmotor, St, Sc, args.index, backend='numba'), args.repeat)
+    print("numba kernel: ", round(numba_time, 4), "s, ", round(args.pairs/numba_time), "pairs/s, speedup ", round(scalar/numba_time, 1))
+
+    a = kernel_safety(R, pairp, pairg, nmin, Tmotor, St, Sc, args.index, backend='numba')
+    b = kernel_safety(R, pairp, pairg, nmin, Tmotor, St, Sc, args.index, backend='numpy')
+    print("same results: ", all(np.allclose(x, y, rtol=1e-12, equal_nan=True) for x, y in zip(a, b)))
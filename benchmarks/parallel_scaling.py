@@ -0,0 +1,38 @@
+# Scaling of run_analysis(workers=...) on a synthetic catalog
+#   python -m benchmarks.parallel_scaling --size 400 --workers 1 2 4 8
+import argparse
+import time
+import numpy as np
+
+from gears.gear_analysis import run_analysis
+from data.synthetic import synthetic_catalog
+
+dtire = 0.499
+Sc = 1895
+St = 515
+Tmotor = 172
+nmin = 110*1000/60*(1/(np.pi*dtire))
+index = 4
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--size', type=int, default=400)
+  parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+  parser.add_argument('--method', default='loop')
+  args = parser.parse_args()
+
+  pinions, gears = synthetic_catalog(args.size)
+
+  start = time.perf_counter()
+  serial = run_analysis(pinions, gears, St, Sc, nmin, Tmotor, index, method=args.method)
+  t_serial = time.perf_counter() - start
+  print("serial: ", round(t_serial, 3), "s, ", len(serial), "combinations")
+
+  for workers in args.workers:
+    start = time.perf_counter()
+    combinations = run_analysis(pinions, gears, St, Sc, nmin, Tmotor, index, method=args.method, workers=workers)
+    t = time.perf_counter() - start
+
+    same = combinations.shape == serial.shape and all(
+      a.N == b.N and a.mod == b.mod for a, b in zip(combinations.ravel(), serial.ravel()))
+    print(workers, "workers: ", round(t, 3), "s, speedup ", round(t_serial/t, 2), ", same order: ", same)
@@ -0,0 +1,219 @@
+# Scaling benchmarks of the gear search, the shaft diagrams and the spline
+# analysis, recorded as JSON and compared against a saved baseline
+#   python -m benchmarks.suite --output bench.json
+#   python -m benchmarks.suite --baseline bench.json --tolerance 0.2
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+import gears.agma_factors as af
+from gears.agma_batch import agma_arrays
+from gears.gear_analysis import run_analysis, search_parameters
+import shafts.diagrams as sd
+from models.spline import Spline
+from splines.spline_analysis import spline_analysis
+from data.result_cache import library_version
+from data.synthetic import synthetic_gear_catalog
+
+dtire = 0.499
+Sc = 1895
+St = 515
+Tmotor = 172
+nmin = 110*1000/60*(1/(np.pi*dtire))
+
+# Shaft layout of main.py, m
+dele = 10/1000
+w_gear = 50/1000
+w_bear = 21/1000
+w_motor = (31.1 - 10 - 6.1)/1000
+
+def factors(index):
+  '''
+  Returns a dict of the AGMA factors evaluated by agma_arrays, as
+  functions of the pinion and gear columns of the analyzed pairs
+  '''
+  analyzed = 'p' if index == 1 or index == 3 else 'g'
+  d = lambda p, g: (p if analyzed == 'p' else g)['dp']
+  N = lambda p, g: (p if analyzed == 'p' else g)['N']
+  Qv = lambda p, g: (p if analyzed == 'p' else g)['Qv']
+  bore = lambda p, g: (p if analyzed == 'p' else g)['bore']
+  V = lambda p, g: af.pitch_line_velocity(p['N'], g['N'], d(p, g), nmin, index)
+  phi = 20*np.pi/180
+
+  return {
+    'ss_geometry_factor': lambda p, g: af.ss_geometry_factor(phi, 0, np.pi*p['mod'], p['dp']/2, g['dp']/2, p['mod'], g['N'], p['N']),
+    'elastic_coefficient': lambda p, g: af.elastic_coefficient(p['v'], g['v'], p['E'], g['E']),
+    'pitch_line_velocity': V,
+    'dynamic_factor': lambda p, g: af.dynamic_factor(V(p, g), Qv(p, g)),
+    'size_factor': lambda p, g: af.size_factor_array(p['F'], N(p, g), d(p, g)),
+    'load_distribution_factor': lambda p, g: af.load_distribution_factor_array(p['F'], d(p, g), 1, 1),
+    'hardness_ratio_factor': lambda p, g: af.hardness_ratio_factor_array(p['N'], g['N'], p['H'], g['H'], index),
+    'stress_cycle_factors': lambda p, g: af.stress_cycle_factors(p['N'], g['N'], index),
+    'rim_thickness_factor': lambda p, g: af.rim_thickness_factor_array(d(p, g), p['mod'], bore(p, g)),
+    'tangential_force': lambda p, g: af.tangential_force(p['N'], g['N'], Tmotor, d(p, g), index),
+  }
+
+def measure(f, repeat):
+  '''
+  Returns (best time, peak traced memory) of f()
+
+  Times are taken without tracing, the peak comes from one more call
+  under tracemalloc (NumPy reports its buffers to tracemalloc).
+  '''
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    f()
+    times.append(time.perf_counter() - start)
+
+  tracemalloc.start()
+  try:
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return min(times), peak
+
+def record(results, name, seconds, peak, items=None, unit='pairs'):
+  entry = {'seconds': seconds, 'peak_bytes': peak}
+  if (items is not None):
+    entry[unit] = items
+    entry[unit + '_per_s'] = items/seconds if seconds > 0 else None
+  results[name] = entry
+  print(name, ": ", round(seconds, 5), "s, ", round(peak/2**20, 2), "MiB",
+    "" if items is None else ", " + str(round(items/seconds)) + " " + unit + "/s")
+
+def search_benchmarks(results, args):
+  '''
+  run_analysis end to end and its AGMA factors on synthetic catalogs
+  '''
+  _, Rp, Rg, _, _ = search_parameters(args.index)
+  R = Rg if args.index == 2 or args.index == 4 else Rp
+
+  for size in args.sizes:
+    pinions, gears = synthetic_gear_catalog(size)
+    tag = '[' + str(size) + ']'
+
+    # Same-module pairs, one module in len(modules) on average
+    pairs = size*size//4
+    if (pairs <= args.max_pairs):
+      for method in args.methods:
+        repeat = args.repeat if method != 'loop' else 1
+        seconds, peak = measure(lambda: run_analysis(pinions, gears, St, Sc, nmin, Tmotor, args.index, method=method), repeat)
+        record(results, 'run_analysis.' + method + tag, seconds, peak, pairs)
+    else:
+      results['run_analysis' + tag] = {'skipped': 'more than --max-pairs same-module pairs'}
+      print('run_analysis' + tag, ": skipped, ", pairs, "pairs")
+
+    # Factors on random pairs of the catalogs
+    count = min(pairs, args.factor_pairs)
+    rng = np.random.default_rng(0)
+    p = {k: c[rng.integers(0, size, count)] for k, c in pinions.columns.items()}
+    g = {k: c[rng.integers(0, size, count)] for k, c in gears.columns.items()}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+      for name, f in factors(args.index).items():
+        seconds, peak = measure(lambda: f(p, g), args.repeat)
+        record(results, 'factor.' + name + tag, seconds, peak, count)
+      seconds, peak = measure(lambda: agma_arrays(R, p, g, nmin, Tmotor, St, Sc, args.index), args.repeat)
+      record(results, 'agma_arrays' + tag, seconds, peak, count)
+
+def diagram_benchmarks(results, args):
+  '''
+  input_shaft and idler_shaft diagrams of the main.py shafts across step sizes
+  '''
+  def input_shaft(h):
+    return sd.input_shaft(dele, w_gear, w_bear, w_motor, 150/1000, 2293.3, 837.7, h=h)
+
+  def idler_shaft(h):
+    return sd.idler_shaft(dele, w_gear, w_bear, 350/1000, 2293.33, 837.7, 175/1000, 4586.66, 1669.40, h=h)
+
+  for h in args.steps:
+    tag = '[h=' + str(h) + ']'
+    for name, f in (('input_shaft', input_shaft), ('idler_shaft', idler_shaft)):
+      try:
+        seconds, peak = measure(lambda: f(h), args.repeat)
+      except IndexError:
+        # Elements must fall on the grid of step h
+        results[name + tag] = {'skipped': 'elements not on the grid'}
+        continue
+      record(results, name + tag, seconds, peak, len(f(h).x), 'points')
+
+def spline_benchmarks(results, args):
+  '''
+  spline_analysis of batches of torques on the main.py input spline
+  '''
+  spline = Spline(1, 24, 24, 25, 22.5, 35, 15, 30)
+  for count in args.splines:
+    T = np.linspace(50, 250, count)
+    seconds, peak = measure(lambda: [spline_analysis(spline, T=t, n=6367.143) for t in T], args.repeat)
+    record(results, 'spline_analysis[' + str(count) + ']', seconds, peak, count, 'splines')
+
+def compare(results, baseline, tolerance):
+  '''
+  Returns the names of the benchmarks slower than the baseline by more
+  than tolerance (relative), printing the time ratios
+  '''
+  print("\nComparison against baseline \n")
+  regressions = []
+  for name, entry in results.items():
+    old = baseline.get(name, {})
+    if ('seconds' not in entry or 'seconds' not in old):
+      continue
+    ratio = entry['seconds']/old['seconds']
+    slower = ratio > 1 + tolerance
+    if (slower == True):
+      regressions.append(name)
+    print(name, ": ", round(ratio, 3), "x", " REGRESSION" if slower else "")
+  return regressions
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--sizes', type=int, nargs='+', default=[10**2, 10**3, 10**4, 10**5, 10**6])
+  parser.add_argument('--index', type=int, default=4)
+  parser.add_argument('--methods', nargs='+', default=['batch'])
+  parser.add_argument('--max-pairs', type=int, default=10**7, help='largest search timed end to end')
+  parser.add_argument('--factor-pairs', type=int, default=10**6, help='max pairs per factor timing')
+  parser.add_argument('--steps', type=float, nargs='+', default=[0.0005, 0.00025, 0.0001, 0.00005])
+  parser.add_argument('--splines', type=int, nargs='+', default=[100, 1000, 10000])
+  parser.add_argument('--repeat', type=int, default=3)
+  parser.add_argument('--only', nargs='+', default=['search', 'diagrams', 'splines'])
+  parser.add_argument('--output', help='JSON file of the results')
+  parser.add_argument('--baseline', help='JSON file of a previous run')
+  parser.add_argument('--tolerance', type=float, default=0.1, help='relative slowdown reported as a regression')
+  args = parser.parse_args()
+
+  results = {}
+  if ('search' in args.only):
+    search_benchmarks(results, args)
+  if ('diagrams' in args.only):
+    diagram_benchmarks(results, args)
+  if ('splines' in args.only):
+    spline_benchmarks(results, args)
+
+  report = {
+    'meta': {
+      'library_version': library_version(),
+      'python': platform.python_version(),
+      'numpy': np.__version__,
+      'machine': platform.machine(),
+      'platform': platform.platform(),
+      'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+      'arguments': vars(args),
+    },
+    'results': results,
+  }
+
+  if (args.output is not None):
+    with open(args.output, 'w') as f:
+      json.dump(report, f, indent=2)
+
+  if (args.baseline is not None):
+    with open(args.baseline) as f:
+      baseline = json.load(f)['results']
+    if (len(compare(results, baseline, args.tolerance)) > 0):
+      sys.exit(1)
@@ -0,0 +1,2 @@
+# Lets pytest import the gears, shafts, splines, models and data packages
+# from the repository root
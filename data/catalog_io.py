@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from models.gear_catalog import GearCatalog, COLUMNS
+
+# Suffix of the binary catalog directory written next to a CSV file
+BINARY_SUFFIX = '.npcat'
+
+def read_csv(path):
+  '''
+  Returns a GearCatalog read from a CSV file
+
+  The header names the columns, either as the Gear constructor arguments
+  (module, number_of_teeth, pitch_diameter, bore, face_width, E, v, H, Qv,
+  weight) or as the Gear attributes (mod, N, dp, bore, F, E, v, H, Qv,
+  weight). weight is optional.
+
+  path: CSV file
+  '''
+  with open(path) as f:
+    header = [name.strip() for name in f.readline().split(',')]
+
+  table = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+
+  values = {}
+  for name, arg, _ in COLUMNS:
+    if (arg in header):
+      values[arg] = table[:, header.index(arg)]
+    elif (name in header):
+      values[arg] = table[:, header.index(name)]
+    elif (arg != 'weight'):
+      raise ValueError("Missing catalog column: " + arg)
+
+  return GearCatalog(**values)
+
+def save_catalog(catalog: GearCatalog, directory):
+  '''
+  Write a catalog as one .npy file per column
+
+  The directory is written to a temporary sibling and renamed into place,
+  so concurrent readers never see a partial catalog.
+
+  catalog: GearCatalog
+  directory: output directory
+  '''
+  directory = os.path.abspath(directory)
+  tmp = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(directory))
+  os.chmod(tmp, 0o755)
+
+  for name, column in catalog.columns.items():
+    np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(column))
+
+  # Move a stale catalog out of the way first, open memory maps stay valid
+  if (os.path.isdir(directory)):
+    old = tempfile.mkdtemp(prefix='.old-', dir=os.path.dirname(directory))
+    try:
+      os.replace(directory, os.path.join(old, 'catalog'))
+    except FileNotFoundError:
+      pass
+    shutil.rmtree(old, ignore_errors=True)
+
+  try:
+    os.replace(tmp, directory)
+  except OSError:
+    # Another process converted the same catalog first
+    shutil.rmtree(tmp, ignore_errors=True)
+
+def open_catalog(directory, mmap=True):
+  '''
+  Returns a GearCatalog whose columns are read from a binary catalog
+
+  directory: directory written by save_catalog
+  mmap: memory-map the columns (read-only) instead of reading them
+  '''
+  mode = 'r' if mmap else None
+  values = {
+    arg: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode)
+    for name, arg, _ in COLUMNS
+  }
+  return GearCatalog(**values)
+
+def load_catalog(path, mmap=True, binary=None):
+  '''
+  Returns a GearCatalog from a CSV file or a binary catalog directory
+
+  A CSV file is converted once to a binary catalog (one .npy per column)
+  next to it; later calls memory-map the binary catalog instead of parsing
+  the CSV again, as long as it is newer than the CSV.
+
+  path: CSV file or binary catalog directory
+  mmap: memory-map the binary columns
+  binary: binary catalog directory (default: path + '.npcat')
+  '''
+  if (os.path.isdir(path)):
+    return open_catalog(path, mmap)
+
+  if (binary is None):
+    binary = path + BINARY_SUFFIX
+
+  stale = (not os.path.isdir(binary)) or os.path.getmtime(binary) < os.path.getmtime(path)
+  if (stale == True):
+    save_catalog(read_csv(path), binary)
+
+  return open_catalog(binary, mmap)
@@ -1,5 +1,6 @@
 import numpy as np
 from models.gear import Gear
+from models.gear_catalog import GearCatalog
 
 Ep = 190*10**3
 Eg = 190*10**3
@@ -49,9 +50,9 @@ p63 = Gear(module=6, number_of_teeth=18, pitch_diameter=108, bore=20, face_width
 g61 = Gear(module=6, number_of_teeth=38, pitch_diameter=220, bore=25, face_width=60, E=Eg, v=vg, H=Hbg, Qv=Qv)
 g62 = Gear(module=6, number_of_teeth=40, pitch_diameter=240, bore=25, face_width=60, E=Eg, v=vg, H=Hbg, Qv=Qv)
 
-SpurPinion = np.array([
+SpurPinion = GearCatalog.from_gears([
   p41, p42, p43, p51, p52, p53, p54, p55, p56, p57, p58, p61, p62, p63
 ])
-SpurGear = np.array([
+SpurGear = GearCatalog.from_gears([
   g41, g42, g51, g52, g53, g54, g55, g56, g57, g58, g59, g61, g62
 ])
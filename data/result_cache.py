@@ -0,0 +1,377 @@
+from functools import lru_cache
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+import zipfile
+import numpy as np
+
+from models.gear import Gear
+from models.gear_catalog import GearCatalog, as_catalog
+from models.shaft_results import ShaftDiagrams
+from models.spline_results import SplineResults
+
+# Default cache directory, overridden by the GEARBOX_CACHE environment variable
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'gearbox')
+
+# Suffix of the cache entries
+ENTRY_SUFFIX = '.npz'
+
+# Result classes an entry may hold, rebuilt from their attributes
+RESULT_TYPES = {cls.__name__: cls for cls in (ShaftDiagrams, SplineResults)}
+
+# Temporary files of writers that died are removed after this many seconds
+STALE_SECONDS = 3600
+
+# Packages whose sources define the library version
+PACKAGES = ('data', 'gears', 'models', 'shafts', 'splines')
+
+@lru_cache
+def library_version():
+  '''
+  Returns a hash of the library sources
+
+  The package has no version number, any edit of a module of PACKAGES
+  changes the cache keys instead.
+  '''
+  root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  h = hashlib.sha256()
+  for package in PACKAGES:
+    directory = os.path.join(root, package)
+    if (os.path.isdir(directory) == False):
+      continue
+    for name in sorted(os.listdir(directory)):
+      if (name.endswith('.py')):
+        h.update((package + '/' + name).encode())
+        with open(os.path.join(directory, name), 'rb') as f:
+          h.update(f.read())
+  return h.hexdigest()
+
+def is_gear_sequence(value):
+  '''
+  Returns True for a non-empty list, tuple or 1D array of Gear objects
+  '''
+  if (isinstance(value, np.ndarray) and value.ndim != 1):
+    return False
+  return isinstance(value, (list, tuple, np.ndarray)) and len(value) > 0 and all(isinstance(gear, Gear) for gear in value)
+
+def fingerprint(h, value):
+  '''
+  Update the hash h with a stable encoding of value
+
+  Catalogs and sequences of Gear (lists, tuples, object arrays) are
+  converted with as_catalog and hashed by their column contents, so the
+  same gears give the same hash in any container. NumPy arrays are hashed
+  by dtype, shape and bytes, other objects (e.g. Spline) by their
+  attributes.
+  '''
+  if (value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic))):
+    h.update(type(value).__name__.encode() + b':' + repr(value).encode() + b';')
+  elif (isinstance(value, GearCatalog) or is_gear_sequence(value)):
+    h.update(b'catalog;')
+    fingerprint(h, as_catalog(value).columns)
+  elif (isinstance(value, Gear)):
+    h.update(b'gear;')
+    fingerprint(h, {name: getattr(value, name) for name in Gear.__slots__})
+  elif (isinstance(value, np.ndarray) and value.dtype != object):
+    h.update(b'array:' + value.dtype.str.encode() + repr(value.shape).encode() + b';')
+    h.update(np.ascontiguousarray(value).tobytes())
+  elif (isinstance(value, dict)):
+    h.update(b'dict:' + str(len(value)).encode() + b';')
+    for k in sorted(value, key=repr):
+      fingerprint(h, k)
+      fingerprint(h, value[k])
+  elif (isinstance(value, (list, tuple, np.ndarray))):
+    h.update(type(value).__name__.encode() + b':' + str(len(value)).encode() + b';')
+    for item in value:
+      fingerprint(h, item)
+  elif (hasattr(value, '__dict__')):
+    h.update(b'object:' + type(value).__qualname__.encode() + b';')
+    fingerprint(h, vars(value))
+  else:
+    raise TypeError("Cannot hash cache input of type " + type(value).__name__)
+
+def pack(value, arrays):
+  '''
+  Returns a JSON description of value, storing its NumPy arrays and
+  scalars in the dict arrays (see unpack)
+
+  value: None, bool, int, float, str, NumPy array or scalar, or a list,
+  tuple, str-keyed dict or RESULT_TYPES object of those
+  '''
+  if (value is None or isinstance(value, (bool, int, float, str))):
+    return {'t': 'json', 'v': value}
+  elif (isinstance(value, (np.ndarray, np.generic)) and value.dtype != object):
+    name = 'a' + str(len(arrays))
+    arrays[name] = np.asarray(value)
+    return {'t': 'array' if isinstance(value, np.ndarray) else 'scalar', 'k': name}
+  elif (isinstance(value, (list, tuple))):
+    return {'t': type(value).__name__, 'v': [pack(item, arrays) for item in value]}
+  elif (isinstance(value, dict) and all(isinstance(k, str) for k in value)):
+    return {'t': 'dict', 'v': {k: pack(item, arrays) for k, item in value.items()}}
+  elif (RESULT_TYPES.get(type(value).__name__) is type(value)):
+    return {'t': 'object', 'c': type(value).__name__, 'v': pack(vars(value), arrays)}
+  raise TypeError("Cannot store cache value of type " + type(value).__name__)
+
+def unpack(spec, arrays):
+  '''
+  Returns the value described by spec, see pack
+  '''
+  kind = spec['t']
+  if (kind == 'json'):
+    return spec['v']
+  elif (kind == 'array'):
+    return arrays[spec['k']]
+  elif (kind == 'scalar'):
+    return arrays[spec['k']][()]
+  elif (kind == 'list' or kind == 'tuple'):
+    items = [unpack(item, arrays) for item in spec['v']]
+    return items if kind == 'list' else tuple(items)
+  elif (kind == 'dict'):
+    return {k: unpack(item, arrays) for k, item in spec['v'].items()}
+  elif (kind == 'object'):
+    value = object.__new__(RESULT_TYPES[spec['c']])
+    vars(value).update(unpack(spec['v'], arrays))
+    return value
+  raise ValueError("Unknown cache entry type: " + kind)
+
+class ResultCache:
+  def __init__(self, directory=None, max_bytes: int = 2**28):
+    '''
+    Persistent cache of analysis results, shared between processes
+
+    Entries are keyed by a SHA-256 of the function name, all its arguments
+    (catalogs by content) and the library version, and stored as one .npz
+    file per entry: the NumPy arrays of the value plus a JSON description
+    of its structure (see pack). Entries are read with allow_pickle=False,
+    so a shared cache directory cannot run code in the reader. Writers write a temporary file and rename it into
+    place, so concurrent readers see either no entry or a complete one.
+    Hits refresh the entry mtime, the least recently used entries are
+    evicted once the cache grows above max_bytes.
+
+    directory: cache directory (default: $GEARBOX_CACHE or CACHE_DIR)
+    max_bytes: size bound of the cache
+    '''
+    if (directory is None):
+      directory = os.environ.get('GEARBOX_CACHE', CACHE_DIR)
+    self.directory = os.path.abspath(directory)
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    os.makedirs(self.directory, exist_ok=True)
+
+  def key(self, name: str, arguments: dict):
+    '''
+    return the hex key of a call
+
+    name: function name
+    arguments: dict of the call arguments
+    '''
+    h = hashlib.sha256()
+    fingerprint(h, (name, library_version(), arguments))
+    return h.hexdigest()
+
+  def path(self, key):
+    return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+  def __contains__(self, key):
+    return os.path.exists(self.path(key))
+
+  def get(self, key):
+    '''
+    return the cached value of key, raises KeyError when missing
+    '''
+    path = self.path(key)
+    try:
+      with np.load(path, allow_pickle=False) as entry:
+        arrays = {name: entry[name] for name in entry.files}
+      value = unpack(json.loads(str(arrays.pop('spec'))), arrays)
+    except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+      self.misses += 1
+      raise KeyError(key)
+
+    try:
+      os.utime(path)
+    except FileNotFoundError:
+      # Evicted by another process while reading
+      pass
+    self.hits += 1
+    return value
+
+  def put(self, key, value):
+    '''
+    store value under key, then evict above max_bytes
+
+    value: see pack, raises TypeError for other values
+    '''
+    arrays = {}
+    spec = json.dumps(pack(value, arrays))
+    arrays['spec'] = np.array(spec)
+
+    fd, tmp = tempfile.mkstemp(prefix='.tmp-', dir=self.directory)
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        np.savez(f, **arrays)
+      os.replace(tmp, self.path(key))
+    except BaseException:
+      try:
+        os.remove(tmp)
+      except FileNotFoundError:
+        pass
+      raise
+    self.evict()
+
+  def entries(self):
+    '''
+    return a list of (mtime, size, path) of the cache entries
+    '''
+    entries = []
+    now = time.time()
+    for entry in os.scandir(self.directory):
+      try:
+        stat = entry.stat()
+      except FileNotFoundError:
+        continue
+      if (entry.name.endswith(ENTRY_SUFFIX)):
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+      elif (entry.name.startswith('.tmp-') and now - stat.st_mtime > STALE_SECONDS):
+        self.remove(entry.path)
+    return entries
+
+  def nbytes(self):
+    return sum(size for _, size, _ in self.entries())
+
+  def remove(self, path):
+    try:
+      os.remove(path)
+    except FileNotFoundError:
+      # Removed by another process
+      pass
+
+  def evict(self, max_bytes: int = None):
+    '''
+    remove the least recently used entries until the cache holds at most
+    max_bytes (default: self.max_bytes)
+    '''
+    if (max_bytes is None):
+      max_bytes = self.max_bytes
+    entries = sorted(self.entries())
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+      if (total <= max_bytes):
+        break
+      self.remove(path)
+      total -= size
+
+  def clear(self):
+    self.evict(0)
+
+  def call(self, function, *args, **kwargs):
+    '''
+    return function(*args, **kwargs), loaded from the cache when the same
+    call was stored before
+
+    Arguments are bound to the signature of function with its defaults,
+    so equivalent calls share an entry.
+    '''
+    arguments = inspect.signature(function).bind(*args, **kwargs)
+    arguments.apply_defaults()
+    key = self.key(function.__module__ + '.' + function.__qualname__, dict(arguments.arguments))
+    try:
+      return self.get(key)
+    except KeyError:
+      value = function(*args, **kwargs)
+      self.put(key, value)
+      return value
+
+  def print(self):
+    print("Result Cache \n\n")
+    print("Directory: ", self.directory)
+    print("Entries: ", len(self.entries()))
+    print("Size: ", self.nbytes(), "bytes of ", self.max_bytes)
+    print("Hits: ", self.hits, ", Misses: ", self.misses)
+
+# Cached analyses, the gears, shafts and splines modules are imported when
+# called so the data package does not depend on them
+
+def cached_pairs(pinions, gears, St, Sc, n, Tmotor, index, method='loop', workers=None, executor=None):
+  '''
+  Returns the (ip, ig) indices of the accepted pairs as compact integer
+  arrays, see gears.gear_analysis.accepted_pairs
+  '''
+  from gears.gear_analysis import accepted_pairs, parallel_pairs
+
+  if (workers is not None or executor is not None):
+    ip, ig = parallel_pairs(pinions, gears, St, Sc, n, Tmotor, index, method, None, workers, executor)
+  else:
+    ip, ig = accepted_pairs(pinions, gears, St, Sc, n, Tmotor, index, method)
+  size = max(len(pinions), len(gears))
+  dtype = np.int32 if size < 2**31 else np.int64
+  return np.asarray(ip, dtype=dtype), np.asarray(ig, dtype=dtype)
+
+def cached_run_analysis(cache: ResultCache, pinions, gears, St, Sc, n, Tmotor, index, method: str = 'loop', workers: int = None, executor = None):
+  '''
+  Returns run_analysis(pinions, gears, St, Sc, n, Tmotor, index), loaded
+  from cache when available
+
+  Only the indices of the accepted pairs are stored, the combinations are
+  rebuilt from the catalogs. method, workers and executor do not change
+  the results and are not part of the key.
+
+  cache: ResultCache
+  (other arguments as in run_analysis)
+  '''
+  key = cache.key('gears.gear_analysis.run_analysis', {
+    'pinions': pinions, 'gears': gears, 'St': St, 'Sc': Sc, 'n': n, 'Tmotor': Tmotor, 'index': index})
+  try:
+    ip, ig = cache.get(key)
+  except KeyError:
+    ip, ig = cached_pairs(pinions, gears, St, Sc, n, Tmotor, index, method, workers, executor)
+    cache.put(key, (ip, ig))
+
+  combinations = np.empty((len(ip), 2), dtype=object)
+  combinations[:, 0] = [pinions[j] for j in ip]
+  combinations[:, 1] = [gears[j] for j in ig]
+  return combinations
+
+def cached_input_shaft(cache: ResultCache, *args, **kwargs):
+  '''
+  Returns the ShaftDiagrams of shafts.diagrams.input_shaft(*args, **kwargs),
+  loaded from cache when available
+  '''
+  import shafts.diagrams as sd
+  return cache.call(sd.input_shaft, *args, **kwargs)
+
+def cached_idler_shaft(cache: ResultCache, *args, **kwargs):
+  '''
+  Returns the ShaftDiagrams of shafts.diagrams.idler_shaft(*args, **kwargs),
+  loaded from cache when available
+  '''
+  import shafts.diagrams as sd
+  return cache.call(sd.idler_shaft, *args, **kwargs)
+
+def cached_input_diagrams(cache: ResultCache, *args, **kwargs):
+  '''
+  Returns the (Fr1_combined, Fr2_combined, Mmax_combined, Tmax) of
+  shafts.diagrams.input_diagrams(*args, **kwargs) from cached_input_shaft,
+  without printing or plotting
+  '''
+  return cached_input_shaft(cache, *args, **kwargs).values()
+
+def cached_idler_diagrams(cache: ResultCache, *args, **kwargs):
+  '''
+  Returns the (Fr1_combined, Fr2_combined, Mmax_combined, Tmax) of
+  shafts.diagrams.idler_diagrams(*args, **kwargs) from cached_idler_shaft,
+  without printing or plotting
+  '''
+  return cached_idler_shaft(cache, *args, **kwargs).values()
+
+def cached_spline_analysis(cache: ResultCache, *args, **kwargs):
+  '''
+  Returns splines.spline_analysis.spline_analysis(*args, **kwargs) loaded
+  from cache when available
+  '''
+  from splines.spline_analysis import spline_analysis
+  return cache.call(spline_analysis, *args, **kwargs)
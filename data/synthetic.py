@@ -0,0 +1,47 @@
+import numpy as np
+from models.gear import Gear
+from models.gear_catalog import GearCatalog
+
+def synthetic_catalog(size, modules=(3, 4, 5, 6), seed=0):
+  '''
+  Returns (pinions, gears) arrays of random stock spur gears
+
+  size: number of pinions and of gears
+  modules: modules drawn uniformly (mm)
+  seed: random seed
+  '''
+  rng = np.random.default_rng(seed)
+
+  def make(n, teeth):
+    m = rng.choice(modules, n)
+    N = rng.integers(teeth[0], teeth[1], n)
+    return np.array([
+      Gear(module=int(m[j]), number_of_teeth=int(N[j]), pitch_diameter=int(m[j]*N[j]), bore=25,
+        face_width=int(10*m[j]), E=190*10**3, v=0.3, H=183, Qv=12)
+      for j in range(n)
+    ])
+
+  pinions = make(size, (15, 50))
+  gears = make(size, (38, 120))
+  return pinions, gears
+
+def synthetic_gear_catalog(size, modules=(3, 4, 5, 6), seed=0):
+  '''
+  Returns (pinions, gears) GearCatalogs with the same gears as
+  synthetic_catalog, built column by column without Gear objects
+
+  size: number of pinions and of gears
+  modules: modules drawn uniformly (mm)
+  seed: random seed
+  '''
+  rng = np.random.default_rng(seed)
+
+  def make(n, teeth):
+    m = rng.choice(modules, n).astype(np.int64)
+    N = rng.integers(teeth[0], teeth[1], n)
+    return GearCatalog(module=m, number_of_teeth=N, pitch_diameter=m*N, bore=25,
+      face_width=10*m, E=190*10**3, v=0.3, H=183, Qv=12)
+
+  pinions = make(size, (15, 50))
+  gears = make(size, (38, 120))
+  return pinions, gears
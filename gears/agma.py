@@ -2,8 +2,9 @@ from models.agma_results import AGMA
 import numpy as np
 import gears.agma_factors as af
 from models.gear import Gear
+from gears.factor_cache import FactorCache
 
-def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric'):
+def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', cache: FactorCache = None, n=None, T=None, cycles=None):
   '''
   Returns the AGMA analysis results
 
@@ -31,6 +32,11 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   index: position of gear in geartrain
   S1: Offset from shaft centerline (mm)
   S: Shaft length (mm)
+  cache: optional FactorCache for the per-gear and material factors
+  n, T, cycles = None: operating point of the analyzed gear, rotation speed
+  (rpm), torque (N*m) and number of load cycles. Override the values
+  derived from nmin, Tmotor and index (equal stage ratios, fixed 1st
+  gearset diameters)
   '''
   m = pinion.mod
   F = pinion.F
@@ -49,6 +55,9 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   Qvp = pinion.Qv
   Qvg = gear.Qv
 
+  # Per-gear factors are looked up in the cache when given
+  memo = af if cache is None else cache
+
   # Convert angles to rad
   phi_t = phi_t*np.pi/180
   psi = psi*np.pi/180
@@ -77,11 +86,11 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   
 
   # Elastic Coefficient
-  Cp = af.elastic_coefficient(vp, vg, Ep, Eg)
+  Cp = memo.elastic_coefficient(vp, vg, Ep, Eg)
   
 
   # Pitch-Line velocity
-  V = af.pitch_line_velocity(Np, Ng, d, nmin, index, arg)
+  V = af.pitch_line_velocity(Np, Ng, d, nmin, index, arg, n)
 
   # Max recommended velocity
   Vmax = af.max_recommended_velocity(Qv, arg)
@@ -104,11 +113,11 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   
 
   # Size factor
-  Ks = af.size_factor(F, N, d)
+  Ks = memo.size_factor(F, N, d)
   
 
   # Load Distribution Factor
-  Km = af.load_distribution_factor(F, d, S1, S)
+  Km = memo.load_distribution_factor(F, d, S1, S, arg)
   
 
   # Hardness Ratio Factor
@@ -116,7 +125,7 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   
 
   # Stress-Cycle Factor
-  factors = af.stress_cycle_factors(Np, Ng, index)
+  factors = af.stress_cycle_factors(Np, Ng, index, cycles)
   
   Yn = factors[0]
   
@@ -138,11 +147,11 @@ def agma(R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=
   else:
     bore = boreg
   
-  Kb = af.rim_thickness_factor(d, m, bore)
+  Kb = memo.rim_thickness_factor(d, m, bore)
   
 
   # Tangential Force
-  Wt = af.tangential_force(Np, Ng, Tmotor, d, index)
+  Wt = af.tangential_force(Np, Ng, Tmotor, d, index, T)
 
   # Radial Force
   Wr = Wt*np.tan(phi_t)
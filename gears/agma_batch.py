@@ -0,0 +1,128 @@
+from models.agma_batch_results import AGMABatch
+from models.gear_catalog import as_catalog
+import numpy as np
+import gears.agma_factors as af
+
+def agma_arrays(R, pinion: dict, gear: dict, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', n=None, T=None, cycles=None):
+  '''
+  Returns the AGMA analysis results for broadcastable pinion/gear columns
+
+  Mirrors gears.agma.agma, with every Gear attribute replaced by an array.
+  pinion and gear are dicts keyed by Gear attribute name (see
+  GearCatalog.columns) whose arrays broadcast against each other, e.g.
+  (P, 1) and (1, G) for a cross product.
+
+  R: Geometry Factor
+  pinion: pinion columns
+  gear: gear columns
+  index: position of gear in geartrain
+  n, T, cycles: optional operating point of the analyzed gear (arrays
+  broadcasting against the columns), see gears.agma.agma
+  '''
+  m = pinion['mod']
+  F = pinion['F']
+  Np = pinion['N']
+  dp = pinion['dp']
+  borep = pinion['bore']
+  Ng = gear['N']
+  dg = gear['dp']
+  boreg = gear['bore']
+  vp = pinion['v']
+  vg = gear['v']
+  Ep = pinion['E']
+  Eg = gear['E']
+  Hbp = pinion['H']
+  Hbg = gear['H']
+  Qvp = pinion['Qv']
+  Qvg = gear['Qv']
+
+  # Convert angles to rad
+  phi_t = phi_t*np.pi/180
+  psi = psi*np.pi/180
+
+  if (index == 1 or index == 3):
+    N = Np
+    d = dp
+    Qv = Qvp
+    bore = borep
+  else:
+    N = Ng
+    d = dg
+    Qv = Qvg
+    bore = boreg
+
+  # Geometry Factor
+  J = af.geometry_factor(R)
+
+  # ss geometry factor
+  pn = np.pi*m
+  I = af.ss_geometry_factor(phi_t, psi, pn, dp/2, dg/2, m, Ng, Np)
+
+  # Elastic Coefficient
+  Cp = af.elastic_coefficient(vp, vg, Ep, Eg)
+
+  # Pitch-Line velocity and max recommended velocity
+  V = af.pitch_line_velocity(Np, Ng, d, nmin, index, arg, n)
+  Vmax = af.max_recommended_velocity(Qv, arg)
+  exceeded = V > Vmax
+
+  # Dynamic, Overload and Surface Condition Factors
+  Kv = af.dynamic_factor(V, Qv, arg)
+  Ko = af.overload_factor()
+  Cf = af.surface_condition_factor()
+
+  # Size, Load Distribution and Hardness Ratio Factors
+  Ks = af.size_factor_array(F, N, d)
+  Km = af.load_distribution_factor_array(F, d, S1, S, arg)
+  Ch = af.hardness_ratio_factor_array(Np, Ng, Hbp, Hbg, index)
+
+  # Stress-Cycle Factor
+  Yn, Zn = af.stress_cycle_factors(Np, Ng, index, cycles)
+
+  # Reliability, Temperature and Rim Thickness Factors
+  Kr = af.reliability_factor(10)
+  Kt = af.temperature_factor()
+  Kb = af.rim_thickness_factor_array(d, m, bore)
+
+  # Tangential and Radial Forces
+  Wt = af.tangential_force(Np, Ng, Tmotor, d, index, T)
+  Wr = Wt*np.tan(phi_t)
+
+  # Stresses
+  sigma = af.bending_stress(Wt, Ko, Kv, Ks, 1/m, F, Km, Kb, J)
+  sigma_all_bending  = af.allowable_bending_stress(St, Yn, Kt, Kr)
+  sigma_c = af.contact_stress(Cp, Wt, Ko, Kv, Ks, Km, dp, F, Cf, I)
+  sigma_all_c = af.allowable_contact_stress(Sc, Zn, Ch, Kt, Kr)
+
+  # Safety Factors
+  Sf = af.safety_factor(sigma,sigma_all_bending)
+  Sh = af.safety_factor(sigma_c,sigma_all_c)
+
+  return AGMABatch(J, I, Cp, Kv, Ko, Cf, Ks, Km, Ch, Yn, Zn, Kr, Kt, Kb, Wt, Wr, sigma, sigma_all_bending, sigma_c, sigma_all_c, Sf, Sh, exceeded)
+
+def agma_batch(R, pinions, gears, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', cross=True, n=None, T=None, cycles=None):
+  '''
+  Returns the AGMA analysis results of many pinion/gear pairs in one call
+
+  With cross=True every pinion is paired with every gear and the results
+  have shape (len(pinions), len(gears)); pairs with mismatched modules are
+  evaluated with the pinion module and should be masked by the caller.
+  With cross=False, pinions and gears are aligned pairs of equal length.
+
+  R: Geometry Factor
+  pinions: GearCatalog or sequence of pinion Gear objects
+  gears: GearCatalog or sequence of gear Gear objects
+  (remaining arguments as in gears.agma.agma)
+  '''
+  pinion = as_catalog(pinions).columns
+  gear = as_catalog(gears).columns
+
+  if (cross == True):
+    pinion = {f: col[:, np.newaxis] for f, col in pinion.items()}
+    gear = {f: col[np.newaxis, :] for f, col in gear.items()}
+
+  # Out of range factors propagate as NaN and fail validity checks
+  with np.errstate(invalid='ignore', divide='ignore'):
+    results = agma_arrays(R, pinion, gear, nmin, Tmotor, St, Sc, index, psi, phi_t, S1, S, arg, n, T, cycles)
+
+  return results
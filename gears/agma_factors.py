@@ -1,6 +1,15 @@
+from functools import lru_cache
 import numpy as np
 import data.lewisfactors as lf
 
+# Vehicle life and driving cycle
+TIRE_DIAMETER = 0.499 # m
+VEHICLE_LIFE = 300000 # km
+
+# Driving Cycles specs, [speed (km/hr), time (s)] per row
+DRIVE_CYCLE = np.array([[20, 600], [40, 400], [60, 500], [110, 300]])
+DRIVE_CYCLE.setflags(write=False)
+
 def bending_stress(Wt, Ko, Kv, Ks, Pd, F, Km, Kb, J):
   '''
   Wt: Tangential Force (N or lbf)
@@ -120,15 +129,34 @@ def elastic_coefficient(vp, vg, Ep, Eg):
 
   return Cp
 
-def pitch_line_velocity(Np, Ng, d, nmin, index, arg: str = 'metric'):
+def speed_ratio(Np, Ng, index):
+  '''
+  Returns the rotation speed of the gear at index over the geartrain output
+  speed, assuming equal stage ratios
+
+  Np: Number of teeth of the pinion
+  Ng: Number of teeth of the gear
+  index: position of the gear in the geartrain
+  '''
   if (index == 4):
-    n = nmin
-  
+    return 1
   elif (index == 2 or index == 3):
-    n = Ng/Np*nmin
-  
+    return Ng/Np
   elif (index == 1):
-    n = (Ng/Np)**2*nmin
+    return (Ng/Np)**2
+
+def pitch_line_velocity(Np, Ng, d, nmin, index, arg: str = 'metric', n=None):
+  '''
+  Np: Number of teeth of the pinion
+  Ng: Number of teeth of the gear
+  d: pitch diameter of the analyzed gear (mm or in)
+  nmin: geartrain output rotation speed (rpm)
+  index: position of the gear in the geartrain
+  n = None: rotation speed of the analyzed gear (rpm), overrides the speed
+  derived from nmin and index (which assumes equal stage ratios)
+  '''
+  if (n is None):
+    n = speed_ratio(Np, Ng, index)*nmin
 
   if (arg == 'metric'):
     V = np.pi*d*n/60000
@@ -174,6 +202,51 @@ def overload_factor():
 def surface_condition_factor():
   return 1
 
+def lewis_table(lf: np.ndarray = lf.lewisFactors):
+  '''
+  Returns a dense Lewis Form Factor array Y[N] for integer tooth counts
+  from 0 to the last table entry, NaN below the first table entry
+
+  lf: Lewis Factors table
+  '''
+  N = np.arange(int(lf[-1, 0]) + 1)
+  Y = np.interp(N, lf[:, 0], lf[:, 1])
+  Y[N < lf[0, 0]] = np.nan
+  Y.flags.writeable = False
+  return Y
+
+# Dense Lewis Form Factors, Y indexed by number of teeth (12 to 400)
+lewisFactors = lf.lewisFactors
+lewis_Y_table = lewis_table(lewisFactors)
+
+def lewis_Y(N, lf: np.ndarray = lf.lewisFactors):
+  '''
+  Vectorized Lewis Form Factor lookup, NaN where N is outside the table
+
+  N: Number of teeth (scalar or array)
+  lf: Lewis Factors table
+  '''
+  table = lewis_Y_table if lf is lewisFactors else lewis_table(lf)
+
+  # Scalar integer number of teeth, direct lookup
+  if (np.ndim(N) == 0 and N == int(N)):
+    if (N < 0 or N >= len(table)):
+      return np.nan
+    return table[int(N)]
+
+  N = np.asarray(N, dtype=float)
+  inside = (N >= lf[0, 0]) & (N <= lf[-1, 0])
+  i = np.where(inside, N, 0).astype(int)
+
+  Y = np.where(inside, table[i], np.nan)
+
+  # Fractional number of teeth, interpolate
+  fractional = inside & (i != N)
+  if (np.any(fractional)):
+    Y = np.where(fractional, np.interp(N, lf[:, 0], lf[:, 1]), Y)
+
+  return Y[()]
+
 def size_factor(F, N, d, lf: np.ndarray = lf.lewisFactors):
   '''
   F: face width (mm or in)
@@ -184,16 +257,29 @@ def size_factor(F, N, d, lf: np.ndarray = lf.lewisFactors):
   # diametral pitch
   P = N/d
 
-  # Lewis Factor Interpolation
-  if (N < 12 or N > 400):
+  # Lewis Factor
+  Y = lewis_Y(N, lf)
+  if (np.isnan(Y)):
     return None
-  else:
-    i = np.where(lf == N)[0] 
 
-    if (len(i) == 0):
-      Y = np.interp(N, lf[:, 0], lf[:, 1])
-    else:
-      Y = lf[i, 1].item()
+  Ks = 1.192*(F*np.sqrt(Y)/P)**0.05035
+
+  return Ks
+
+def size_factor_array(F, N, d, lf: np.ndarray = lf.lewisFactors):
+  '''
+  Vectorized size_factor, NaN where N is outside the Lewis table
+
+  F: face width (mm or in)
+  N: Number of teeth
+  d: pitch diameter (mm or in)
+  lf: Lewis Factors table
+  '''
+  # diametral pitch
+  P = N/d
+
+  # Lewis Factor
+  Y = lewis_Y(N, lf)
 
   Ks = 1.192*(F*np.sqrt(Y)/P)**0.05035
 
@@ -260,6 +346,51 @@ def load_distribution_factor(F, d, S1, S, arg: str = 'metric'):
   
   return Km
 
+def load_distribution_factor_array(F, d, S1, S, arg: str = 'metric'):
+  '''
+  Vectorized load_distribution_factor, NaN where F is out of range
+
+  F: Face width (mm or in)
+  d: pitch diameter (mm or in)
+  S1: Gear centerline offset distance from shaft center (mm or in)
+  S: Shaft length (mm or in)
+  '''
+  F = np.asarray(F, dtype=float)
+
+  # Lead Correction Factor
+  Cmc = 1 # uncrowned teeth
+
+  # mesh alignment correction factor
+  Ce = 1 # no adjustment at assembly or lapping
+
+  # pinion proportion modifier
+  Cpm = np.where(np.asarray(S1)/S < 0.175, 1, 1.1)
+
+  x = F/(10*d)
+  if (arg == 'metric'):
+    limits = (25, 432, 1020)
+    A = 0.274 # from  L11 Table 14-9
+    B = 0.657e-3
+    C = -1.186e-7
+  elif (arg == 'us'):
+    limits = (1, 17, 40)
+    A = 0.274 # from AGMA 2101-D04 Table 2
+    B = 0.0167
+    C = -0.765e-4
+
+  # pinion-proportion Factor
+  Cpf = np.select(
+    [F <= limits[0], F <= limits[1], F <= limits[2]],
+    [x - 0.025, x - 0.0375 + 0.000492*F, x - 0.1109 + 0.000815*F -0.000000353*F**2],
+    np.nan)
+
+  # mesh alignment factor
+  Cma = A + B*F + C*F**2
+
+  Km = 1 + Cmc*(Cpf*Cpm+Cma*Ce)
+
+  return Km
+
 def hardness_ratio_factor(Np, Ng, Hbp, Hbg, index):
   '''
   Hbp: Brinell Hardness of the pinion
@@ -284,21 +415,41 @@ def hardness_ratio_factor(Np, Ng, Hbp, Hbg, index):
 
   return Ch
 
-def stress_cycle_factors(Np, Ng, index = 4):
+def hardness_ratio_factor_array(Np, Ng, Hbp, Hbg, index):
   '''
-  Np: Number of teeth of the pinion
-  Ng: number of teeth of the gear
-  index: position of the gear in the gear train. 1 = nearest to motor
+  Vectorized hardness_ratio_factor, NaN where Hbp/Hbg > 1.7
+
+  Hbp: Brinell Hardness of the pinion
+  Hbg: Brinell Hardness of the gear
+  index: position of the gear in the geartrain
+  '''
+  r = np.asarray(Hbp/Hbg, dtype=float)
+  mg = Ng/Np
+
+  if (index == 1 or index == 3):
+    return np.ones(np.broadcast(r, mg).shape)
+
+  A = np.where(r < 1.2, 0, np.where(r <= 1.7, 8.98e-3*r-8.29e-3, np.nan))
+
+  Ch = 1.0 + A*(mg - 1)
+
+  return Ch
+
+@lru_cache(maxsize=None)
+def life_cycles():
+  '''
+  Returns the minimum number of geartrain output (wheel) revolutions over
+  the vehicle life, computed once
   '''
   # tire diameter
-  dtire = 0.499 # m
+  dtire = TIRE_DIAMETER
 
   # Vehicle Life
-  L = 300000
-  
+  L = VEHICLE_LIFE
+
   # Driving Cycles specs
-  drv_cycle = np.array([[20, 600], [40, 400], [60, 500], [110, 300]])
-  
+  drv_cycle = DRIVE_CYCLE
+
   # Distance per driving cycle
   dist_per_cycle = 1/3600*drv_cycle[:, 0] @ drv_cycle[:, 1]
   
@@ -308,13 +459,25 @@ def stress_cycle_factors(Np, Ng, index = 4):
   # minimum number of cycles
   M_min = N_cycles*1000/(np.pi*dtire)*dist_per_cycle
 
+  return M_min
+
+def stress_cycle_factors(Np, Ng, index = 4, cycles=None):
+  '''
+  Np: Number of teeth of the pinion
+  Ng: number of teeth of the gear
+  index: position of the gear in the gear train. 1 = nearest to motor
+  cycles = None: number of load cycles of the analyzed gear, overrides the
+  count derived from life_cycles() and index
+  '''
   # Scale minimum number of cycles based on gear in the geartrain
-  if (index == 1):
-    N = (Ng/Np)**2*M_min
+  if (cycles is not None):
+    N = cycles
+  elif (index == 1):
+    N = (Ng/Np)**2*life_cycles()
   elif (index == 2 or index == 3):
-    N = (Ng/Np)**2*M_min
+    N = (Ng/Np)**2*life_cycles()
   else:
-    N = M_min
+    N = life_cycles()
 
   # Factors (e8 cycles or greater)
   YN = 1.3558*N**(-0.0178)
@@ -322,6 +485,19 @@ def stress_cycle_factors(Np, Ng, index = 4):
 
   return YN, ZN
 
+def stress_cycle_life(YN=None, ZN=None):
+  '''
+  Returns the number of load cycles at which the stress-cycle factors of
+  stress_cycle_factors reach YN (bending) and ZN (contact), i.e. the
+  inverse of the stress-cycle curves
+
+  YN: bending stress-cycle factor, required stress over allowable stress
+  ZN: contact stress-cycle factor
+  '''
+  NY = None if YN is None else (YN/1.3558)**(-1/0.0178)
+  NZ = None if ZN is None else (ZN/1.4488)**(-1/0.023)
+  return NY, NZ
+
 def reliability_factor(num_components):
   '''
   num_components: number of components in the assembly
@@ -359,6 +535,23 @@ def rim_thickness_factor(d, m, bore):
 
   return Kb
 
+def rim_thickness_factor_array(d, m, bore):
+  '''
+  Vectorized rim_thickness_factor
+
+  d: pitch diameter (in or mm)
+  m: module (in or mm)
+  bore: diameter of bore (in or mm)
+  '''
+  tr = d/2 - 1.25*m - bore/2 
+  ht = 2.25*m
+
+  mb = np.asarray(tr/ht, dtype=float)
+
+  Kb = np.where(mb >= 1.2, 1, 1.6*np.log(2.242/mb))
+
+  return Kb
+
 def safety_factor(sigma, sigma_all):
   '''
   sigma: observed stress (MPa or Psi)
@@ -366,13 +559,15 @@ def safety_factor(sigma, sigma_all):
   '''
   return sigma_all/sigma
 
-def tangential_force(Np, Ng, Tmotor, d, index):
+def tangential_force(Np, Ng, Tmotor, d, index, T=None):
   '''
   Np: Number of teeth of the pinion
   Ng: Number of teeth of the gear
-  T: Motor power output
+  Tmotor: Motor torque (N*m)
   d: gear pitch diameter (mm)
   index: position of the gear in the geartrain
+  T = None: torque on the analyzed gear (N*m), overrides the torque
+  derived from Tmotor and the fixed 1st gearset diameters below
   '''
   # After 1st gearset selection, define values
   d1 = 150/1000
@@ -382,7 +577,10 @@ def tangential_force(Np, Ng, Tmotor, d, index):
   # convert diameter to m
   d = d/1000
 
-  if (index == 1):
+  if (T is not None):
+    Wt = 2*T/(d)
+
+  elif (index == 1):
     # d = d1
     Wt = 2*Tmotor/(d)
   
@@ -0,0 +1,166 @@
+import numpy as np
+import gears.agma_factors as af
+from models.agma_results import AGMA
+from models.gear import Gear
+
+# Gear attributes feeding the graph, as (pinion input, gear input, attribute)
+GEAR_INPUTS = (
+  ('m', None, 'mod'),
+  ('F', None, 'F'),
+  ('Np', 'Ng', 'N'),
+  ('dp', 'dg', 'dp'),
+  ('borep', 'boreg', 'bore'),
+  ('vp', 'vg', 'v'),
+  ('Ep', 'Eg', 'E'),
+  ('Hbp', 'Hbg', 'H'),
+  ('Qvp', 'Qvg', 'Qv'),
+)
+
+def select(index, pinion_value, gear_value):
+  '''
+  return the pinion value for the pinion positions (index 1 or 3)
+  '''
+  if (index == 1 or index == 3):
+    return pinion_value
+  return gear_value
+
+def over_limit(V, Vmax):
+  return bool(V > Vmax)
+
+# AGMA factors as a DAG: node name -> (function, input node names), in the
+# order of gears.agma.agma. Nodes without an entry are inputs.
+NODES = {
+  'N': (select, ('index', 'Np', 'Ng')),
+  'd': (select, ('index', 'dp', 'dg')),
+  'Qv': (select, ('index', 'Qvp', 'Qvg')),
+  'bore': (select, ('index', 'borep', 'boreg')),
+  'phi': (lambda phi_t: phi_t*np.pi/180, ('phi_t',)),
+  'psi_rad': (lambda psi: psi*np.pi/180, ('psi',)),
+  'J': (af.geometry_factor, ('R',)),
+  'I': (lambda phi, psi, m, dp, dg, Ng, Np: af.ss_geometry_factor(phi, psi, np.pi*m, dp/2, dg/2, m, Ng, Np),
+        ('phi', 'psi_rad', 'm', 'dp', 'dg', 'Ng', 'Np')),
+  'Cp': (af.elastic_coefficient, ('vp', 'vg', 'Ep', 'Eg')),
+  'V': (af.pitch_line_velocity, ('Np', 'Ng', 'd', 'nmin', 'index', 'arg', 'n')),
+  'Vmax': (af.max_recommended_velocity, ('Qv', 'arg')),
+  'exceeded': (over_limit, ('V', 'Vmax')),
+  'Kv': (af.dynamic_factor, ('V', 'Qv', 'arg')),
+  'Ko': (af.overload_factor, ()),
+  'Cf': (af.surface_condition_factor, ()),
+  'Ks': (af.size_factor, ('F', 'N', 'd')),
+  'Km': (af.load_distribution_factor, ('F', 'd', 'S1', 'S', 'arg')),
+  'Ch': (af.hardness_ratio_factor, ('Np', 'Ng', 'Hbp', 'Hbg', 'index')),
+  'YZ': (af.stress_cycle_factors, ('Np', 'Ng', 'index', 'cycles')),
+  'Yn': (lambda YZ: YZ[0], ('YZ',)),
+  'Zn': (lambda YZ: YZ[1], ('YZ',)),
+  'Kr': (lambda: af.reliability_factor(10), ()),
+  'Kt': (af.temperature_factor, ()),
+  'Kb': (af.rim_thickness_factor, ('d', 'm', 'bore')),
+  'Wt': (af.tangential_force, ('Np', 'Ng', 'Tmotor', 'd', 'index', 'T')),
+  'Wr': (lambda Wt, phi: Wt*np.tan(phi), ('Wt', 'phi')),
+  'sigma': (lambda Wt, Ko, Kv, Ks, m, F, Km, Kb, J: af.bending_stress(Wt, Ko, Kv, Ks, 1/m, F, Km, Kb, J),
+            ('Wt', 'Ko', 'Kv', 'Ks', 'm', 'F', 'Km', 'Kb', 'J')),
+  'sigma_all_bending': (af.allowable_bending_stress, ('St', 'Yn', 'Kt', 'Kr')),
+  'sigma_c': (af.contact_stress, ('Cp', 'Wt', 'Ko', 'Kv', 'Ks', 'Km', 'dp', 'F', 'Cf', 'I')),
+  'sigma_all_c': (af.allowable_contact_stress, ('Sc', 'Zn', 'Ch', 'Kt', 'Kr')),
+  'Sf': (af.safety_factor, ('sigma', 'sigma_all_bending')),
+  'Sh': (af.safety_factor, ('sigma_c', 'sigma_all_c')),
+}
+
+# Fields of models.agma_results.AGMA, in constructor order
+RESULTS = ('J', 'I', 'Cp', 'Kv', 'Ko', 'Cf', 'Ks', 'Km', 'Ch', 'Yn', 'Zn', 'Kr', 'Kt', 'Kb', 'Wt', 'Wr',
+           'sigma', 'sigma_all_bending', 'sigma_c', 'sigma_all_c', 'Sf', 'Sh', 'exceeded')
+
+def dependents():
+  '''
+  Returns the nodes depending directly on each node
+  '''
+  children = {}
+  for name, (_, inputs) in NODES.items():
+    for node in inputs:
+      children.setdefault(node, []).append(name)
+  return children
+
+DEPENDENTS = dependents()
+
+# Input names accepted by AGMAGraph.set
+INPUTS = frozenset(name for name in DEPENDENTS if name not in NODES) | frozenset(
+  name for p, g, _ in GEAR_INPUTS for name in (p, g) if name is not None)
+
+class AGMAGraph:
+  def __init__(self, R, pinion: Gear, gear: Gear, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', n=None, T=None, cycles=None):
+    '''
+    Incremental AGMA analysis: the factors of gears.agma.agma as a
+    dependency graph, recomputed lazily and only when one of their inputs
+    changed
+
+    After set(Tmotor=...) only Wt, Wr, the stresses and the safety factors
+    are recomputed; after set(Qvp=...) only Vmax, Kv and their dependents.
+
+    (arguments as in gears.agma.agma)
+    '''
+    self.values = {}
+    self.evaluations = 0
+    self.set(R=R, nmin=nmin, Tmotor=Tmotor, St=St, Sc=Sc, index=index, psi=psi, phi_t=phi_t,
+             S1=S1, S=S, arg=arg, n=n, T=T, cycles=cycles)
+    self.set_gears(pinion, gear)
+
+  def set(self, **inputs):
+    '''
+    Change inputs (e.g. Tmotor=200, Qvg=9) and invalidate their dependents,
+    unchanged values are ignored. Names outside INPUTS raise KeyError.
+    '''
+    for name, value in inputs.items():
+      if (name in NODES):
+        raise KeyError(name + " is computed, not an input")
+      if (name not in INPUTS):
+        raise KeyError("Unknown input: " + name)
+      if (name in self.values and np.array_equal(self.values[name], value)):
+        continue
+      self.invalidate(name)
+      self.values[name] = value
+
+  def set_gears(self, pinion: Gear = None, gear: Gear = None):
+    '''
+    Change the pinion and/or the gear, only the attributes that differ
+    invalidate their dependents
+    '''
+    inputs = {}
+    for p, g, attribute in GEAR_INPUTS:
+      if (pinion is not None):
+        inputs[p] = getattr(pinion, attribute)
+      if (gear is not None and g is not None):
+        inputs[g] = getattr(gear, attribute)
+
+    self.set(**inputs)
+
+  def invalidate(self, name):
+    '''
+    Drop the computed values depending on a node
+    '''
+    stack = list(DEPENDENTS.get(name, ()))
+    while (len(stack) > 0):
+      node = stack.pop()
+      if (node in self.values):
+        del self.values[node]
+        stack.extend(DEPENDENTS.get(node, ()))
+
+  def __getitem__(self, name):
+    '''
+    return the value of a node, computing the stale nodes it depends on
+    '''
+    if (name in self.values):
+      return self.values[name]
+    if (name not in NODES):
+      raise KeyError(name)
+
+    function, inputs = NODES[name]
+    value = function(*(self[node] for node in inputs))
+    self.values[name] = value
+    self.evaluations += 1
+    return value
+
+  def results(self):
+    '''
+    return the AGMA results, models.agma_results.AGMA
+    '''
+    return AGMA(*(self[name] for name in RESULTS))
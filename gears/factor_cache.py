@@ -0,0 +1,46 @@
+from functools import lru_cache
+import gears.agma_factors as af
+
+class FactorCache:
+  def __init__(self, maxsize=4096):
+    '''
+    Memoize the AGMA factors that depend on a single gear or on the
+    material pair only, so they are computed once per search
+
+    Each factor is an LRU cache keyed on its arguments (the gear geometry
+    or material), bounded to maxsize entries.
+
+    maxsize: max number of cached values per factor
+    '''
+    self.size_factor = lru_cache(maxsize)(af.size_factor)
+    self.load_distribution_factor = lru_cache(maxsize)(af.load_distribution_factor)
+    self.rim_thickness_factor = lru_cache(maxsize)(af.rim_thickness_factor)
+    self.elastic_coefficient = lru_cache(maxsize)(af.elastic_coefficient)
+
+  def info(self):
+    '''
+    return a dict of functools cache_info per factor
+    '''
+    return {
+      'size_factor': self.size_factor.cache_info(),
+      'load_distribution_factor': self.load_distribution_factor.cache_info(),
+      'rim_thickness_factor': self.rim_thickness_factor.cache_info(),
+      'elastic_coefficient': self.elastic_coefficient.cache_info(),
+    }
+
+  @property
+  def hits(self):
+    return sum(info.hits for info in self.info().values())
+
+  @property
+  def misses(self):
+    return sum(info.misses for info in self.info().values())
+
+  def clear(self):
+    for name in self.info():
+      getattr(self, name).cache_clear()
+
+  def print(self):
+    print("AGMA Factor Cache \n\n")
+    for name, info in self.info().items():
+      print(name, ": ", info.hits, "hits, ", info.misses, "misses, ", info.currsize, "entries")
@@ -0,0 +1,93 @@
+from functools import lru_cache
+import numpy as np
+from models.search_report import SearchReport
+from gears.reduction import max_geartrain_value
+from gears.interference import min_pinion_teeth
+
+def feasibility_masks(Np, Ng, phi=20, k=1, vmax=180, tdia=0.499, nmax=10000):
+  '''
+  Returns boolean tables indexed by [i, j] for the pinion tooth count
+  Np[i] and the gear tooth count Ng[j]
+
+  reduce: True where gears.reduction.valid_reduction(Np, Ng) holds
+  interf: True where gears.interference.interference(Ng, Np, phi, k) holds
+
+  Np, Ng: 1D arrays of tooth counts
+  (other arguments as in feasibility_table)
+  '''
+  Np = np.asarray(Np, dtype=float)[:, np.newaxis]
+  Ng = np.asarray(Ng, dtype=float)[np.newaxis, :]
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    reduce = (Np/Ng)**2 <= max_geartrain_value(vmax, tdia, nmax)
+    interf = min_pinion_teeth(Ng, Np, phi, k) <= Np
+
+  # 0 teeth is not a gear
+  zero = (Np == 0) | (Ng == 0)
+  reduce &= ~zero
+  interf &= ~zero
+  return reduce, interf
+
+# Only the tables of the latest searches are kept, each holds (Nmax + 1)**2
+# entries
+@lru_cache(maxsize=4)
+def feasibility_table(Nmax, phi=20, k=1, vmax=180, tdia=0.499, nmax=10000):
+  '''
+  Returns boolean lookup tables indexed by [Np, Ng] for 0 <= Np, Ng <= Nmax
+
+  reduce: True where gears.reduction.valid_reduction(Np, Ng) holds
+  interf: True where gears.interference.interference(Ng, Np, phi, k) holds
+
+  Nmax: largest number of teeth in the catalog
+  phi: pressure angle (deg)
+  k: full depth teeth = 1, stub teeth = 0.8
+  vmax, tdia, nmax: speed envelope, see gears.reduction.max_geartrain_value
+  '''
+  N = np.arange(Nmax + 1)
+  reduce, interf = feasibility_masks(N, N, phi, k, vmax, tdia, nmax)
+
+  reduce.flags.writeable = False
+  interf.flags.writeable = False
+  return reduce, interf
+
+def distinct_teeth(N):
+  '''
+  Returns the distinct tooth counts of N, ascending, and the position of
+  each element of N among them
+  '''
+  present = np.zeros(int(N.max(initial=0)) + 1, dtype=bool)
+  present[N] = True
+  values = np.flatnonzero(present)
+  position = np.cumsum(present) - 1
+  return values, position[N]
+
+def feasible_pairs(Np, Ng, phi=20, k=1, vmax=180, tdia=0.499, nmax=10000, report: SearchReport = None):
+  '''
+  Returns the mask of the (Np, Ng) pairs passing the reduction and
+  interference checks
+
+  The checks are tabulated over the distinct tooth counts of Np and Ng
+  only, so the tables stay small for catalogs with large tooth counts.
+
+  Np, Ng: number of teeth of the pinion and of the gear of each pair,
+  e.g. from gears.join.module_pairs
+  report: optional SearchReport, updated with the pairs removed by each check
+  '''
+  Np = np.asarray(Np, dtype=int)
+  Ng = np.asarray(Ng, dtype=int)
+
+  pinion_teeth, ip = distinct_teeth(Np)
+  gear_teeth, ig = distinct_teeth(Ng)
+  reduce, interf = feasibility_masks(pinion_teeth, gear_teeth, phi, k, vmax, tdia, nmax)
+
+  reduced = reduce[ip, ig]
+  feasible = reduced & interf[ip, ig]
+
+  if (report is not None):
+    n_reduced = int(np.count_nonzero(reduced))
+    n_feasible = int(np.count_nonzero(feasible))
+    report.reduction += Np.size - n_reduced
+    report.interference += n_reduced - n_feasible
+    report.feasible += n_feasible
+
+  return feasible
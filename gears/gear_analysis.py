@@ -1,11 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import os
 import numpy as np
 import gears.agma as ag
-from gears.reduction import valid_reduction
-from gears.interference import interference
+from gears.agma_batch import agma_batch
+from gears.kernels import kernel_analysis
+from gears.stream import stream_analysis, BLOCK
+from gears.feasibility import feasible_pairs, feasibility_table
+from gears.join import module_pairs
+from gears.factor_cache import FactorCache
+from gears.instrumentation import search_report
+from models.search_report import SearchReport
+from models.agma_batch_results import AGMABatch
+from models.gear_catalog import GearCatalog, as_catalog
 
-def run_analysis(pinions: np.ndarray, gears: np.ndarray, St, Sc, n, Tmotor, index):
-  
-  combinations = np.empty((1, 2))
+# Search methods of run_analysis and accepted_pairs, and of iter_combinations
+METHODS = ('loop', 'batch', 'prune', 'kernel', 'stream')
+ITER_METHODS = ('loop', 'prune')
+
+def run_analysis(pinions: np.ndarray, gears: np.ndarray, St, Sc, n, Tmotor, index, method: str = 'loop', report: SearchReport = None, workers: int = None, executor = None, block: int = BLOCK):
+  '''
+  Returns the [pinion, gear] combinations passing the AGMA analysis
+
+  Only same-module pairs are generated (gears.join), and pairs failing the
+  reduction or interference checks are pruned with gears.feasibility
+  before any AGMA evaluation.
+
+  method: 'loop' checks one pair at a time, 'batch' evaluates all the
+  feasible pairs at once with gears.agma_batch, 'prune' checks one pair
+  at a time but skips the AGMA evaluations that cannot succeed (see
+  iter_accepted_pruned), 'kernel' evaluates all the feasible pairs with
+  the compiled kernel of gears.kernels (NumPy batch without Numba),
+  'stream' evaluates the same-module pairs in blocks of block pairs (see
+  gears.stream). Only the working buffers are bounded, the accepted pairs
+  of every block are still collected into the result: use stream_pairs
+  or stream_combinations to bound the memory of the results too
+  report: optional SearchReport, updated with the pruning counts (default:
+  the report of an active gears.instrumentation.instrument block)
+  workers: number of processes, splits the pinions into chunks evaluated
+  in a ProcessPoolExecutor. Results are merged in the serial order.
+  executor: optional concurrent.futures executor to use instead, workers
+  then gives its number of workers (default: os.cpu_count())
+  block: max pairs per block of the 'stream' method
+  '''
+  check_method(method)
+  report = search_report(report)
+  if (workers is not None or executor is not None):
+    ip, ig = parallel_pairs(pinions, gears, St, Sc, n, Tmotor, index, method, report, workers, executor)
+  else:
+    ip, ig = accepted_pairs(pinions, gears, St, Sc, n, Tmotor, index, method, report, block)
+
+  combinations = np.empty((len(ip), 2), dtype=object)
+  combinations[:, 0] = [pinions[j] for j in ip]
+  combinations[:, 1] = [gears[j] for j in ig]
+  return combinations
+
+def check_method(method, methods=METHODS):
+  '''
+  Raise ValueError if method is not one of methods
+  '''
+  if (method not in methods):
+    raise ValueError("Unknown search method: " + repr(method) + ", expected one of " + ", ".join(methods))
+
+def search_parameters(index):
+  '''
+  Returns (i, Rp, Rg, k, phi) for the gearset containing gear index
+
+  i: index of the pinion in the geartrain (1 or 3)
+  Rp, Rg: pinion and gear geometry factors
+  k: tooth depth factor
+  phi: pressure angle (deg)
+  '''
 
   if (index == 1 or index == 2):
     # Analyze first gearset
@@ -15,62 +80,452 @@ def run_analysis(pinions: np.ndarray, gears: np.ndarray, St, Sc, n, Tmotor, inde
     # Analyze second gearset
     i = 3
 
-  for pinion in pinions:
-    
-    # Define parameters
+  # First Iteration, Np = 15
+  # Rp = 0.25
+
+  # 2nd interation min Geometry Factor, Np = 30
+  # Rp = 0.385
+
+  # Third iteration min Geometry Factor
+  Rp = 0.41
+
+  # For Helical Gears, min geometry factor
+  # Rp = 0.56
+
+  # First Iteration, Ng = 30
+  # Rg = 0.37
+
+  # 2nd Interation Define Min Geometry Factor Ng = 70
+  # Rg = 0.43
+
+  # 3rd Iteration
+  Rg = 0.45
+
+  # Helical Gear, min geometry factor
+  # Rg = 0.5238
+
+  k = 1 # full depth teeth
+  phi = 20 # typical pressure angle
+
+  return i, Rp, Rg, k, phi
+
+def candidate_pairs(pinions: GearCatalog, gears: GearCatalog, k, phi, report: SearchReport = None):
+  '''
+  Returns the pinion and gear indices of the pairs worth an AGMA analysis
+  '''
+  # Only same-module pairs can mesh
+  ip, ig = module_pairs(pinions, gears, report)
+
+  # Check for reduction & interference
+  feasible = feasible_pairs(pinions.N[ip], gears.N[ig], phi, k, report=report)
+  return ip[feasible], ig[feasible]
+
+def iter_accepted(pinions: GearCatalog, gears: GearCatalog, St, Sc, n, Tmotor, index, report: SearchReport = None, cache: FactorCache = None):
+  '''
+  Yields (pinion index, gear index, pinion AGMA, gear AGMA) for every
+  pair passing the AGMA analysis, checking one pair at a time
+
+  cache: FactorCache shared by the AGMA evaluations (default: a new one)
+  '''
+  if (cache is None):
+    cache = FactorCache()
+  if (report is None):
+    report = SearchReport()
+
+  i, Rp, Rg, k, phi = search_parameters(index)
+  ip, ig = candidate_pairs(pinions, gears, k, phi, report)
+
+  # Match each pinion with every feasible gear
+  for p, g in zip(ip.tolist(), ig.tolist()):
+    pinion = pinions[p]
+    gear = gears[g]
+
+    # 1) Check Pinion
+    validp = ag.agma(Rp, pinion, gear, n, Tmotor, St, Sc, index=i, cache=cache)
+
+    # 2) Check Gear
+    validg = ag.agma(Rg, pinion, gear, n, Tmotor, St, Sc, index=i+1, cache=cache)
+    report.evaluated += 2
+
+    if (validp.valid(thresh=2) == True and validg.valid(thresh=2) == True):
+      report.accepted += 1
+      yield p, g, validp, validg
+
+def iter_accepted_pruned(pinions: GearCatalog, gears: GearCatalog, St, Sc, n, Tmotor, index, report: SearchReport = None, cache: FactorCache = None):
+  '''
+  Yields the same pairs as iter_accepted, in the same order, with fewer
+  AGMA evaluations
+
+  For each pinion, the gears of its module are sorted by number of teeth:
+  - the reduction check holds above a tooth count and the interference
+    check below one, so whole ranges are cut without looking at them
+  - the gear is not checked when the pinion already fails
+  - the pinion bending safety factor and pitch-line velocity only depend
+    on the gear through Ng and get worse as Ng grows, so once the pinion
+    fails in bending or velocity every gear with more teeth is skipped
+
+  cache: FactorCache shared by the AGMA evaluations (default: a new one)
+  '''
+  if (cache is None):
+    cache = FactorCache()
+  if (report is None):
+    report = SearchReport()
+
+  i, Rp, Rg, k, phi = search_parameters(index)
+  thresh = 2
+
+  Nmax = int(max(pinions.N.max(initial=0), gears.N.max(initial=0)))
+  reduce, interf = feasibility_table(Nmax, phi, k)
+
+  # Gears of each module sorted by number of teeth
+  groups = {}
+  for mod, ig in gears.module_index.items():
+    order = np.argsort(gears.N[ig], kind='stable')
+    groups[mod] = (ig[order], gears.N[ig][order])
+
+  report.considered += len(pinions)*len(gears)
+
+  for p in range(len(pinions)):
+    pinion = pinions[p]
+
+    # Only same-module pairs can mesh
+    ig, Ng = groups.get(pinion.mod, (np.empty(0, dtype=np.intp), np.empty(0, dtype=int)))
+    report.module += len(gears) - len(ig)
+
+    # Reduction holds from the first Ng in reduce[Np], interference up to
+    # the last Ng in interf[Np]
     Np = pinion.N
+    first = np.argmax(reduce[Np]) if reduce[Np].any() else Nmax + 1
+    last = Nmax - np.argmax(interf[Np][::-1]) if interf[Np].any() else -1
+    lo = int(np.searchsorted(Ng, first, 'left'))
+    hi = max(lo, int(np.searchsorted(Ng, last, 'right')))
+
+    candidates = [j for j in range(lo, hi) if interf[Np, Ng[j]]]
+    report.reduction += lo
+    report.interference += len(ig) - lo - len(candidates)
+    report.feasible += len(candidates)
+
+    accepted = []
+    for position, j in enumerate(candidates):
+      gear = gears[ig[j]]
+
+      # 1) Check Pinion
+      validp = ag.agma(Rp, pinion, gear, n, Tmotor, St, Sc, index=i, cache=cache)
+      report.evaluated += 1
 
-    # First Iteration, Np = 15
-    # Rp = 0.25
-    
-    # 2nd interation min Geometry Factor, Np = 30
-    # Rp = 0.385
-    
-    # Third iteration min Geometry Factor
-    Rp = 0.41
-    
-    # For Helical Gears, min geometry factor
-    # Rp = 0.56
-
-    # Try to match each pinion with every possible gear
-    for gear in gears:
-      
-      if (pinion.mod != gear.mod):
+      if (validp.valid(thresh) == False):
+        # Gear check not needed
+        report.skipped += 1
+
+        if (validp.Sf < thresh or validp.exceeded == True):
+          # Every remaining gear has at least as many teeth
+          report.skipped += 2*(len(candidates) - position - 1)
+          break
         continue
-      
-      # Define Parameters
-      Ng = gear.N
 
-      # Check for reduction & interference
-      reduce = valid_reduction(Np, Ng)
-      k = 1 # full depth teeth
-      phi = 20 # typical pressure angle
-      interf = interference(Ng, Np, phi, k)
+      # 2) Check Gear
+      validg = ag.agma(Rg, pinion, gear, n, Tmotor, St, Sc, index=i+1, cache=cache)
+      report.evaluated += 1
+
+      if (validg.valid(thresh) == True):
+        accepted.append((ig[j].item(), validp, validg))
+
+    # Back to catalog order
+    accepted.sort(key=lambda pair: pair[0])
+    report.accepted += len(accepted)
+    for g, validp, validg in accepted:
+      yield p, g, validp, validg
+
+def iter_combinations(pinions, gears, St, Sc, n, Tmotor, index, report: SearchReport = None, cache: FactorCache = None, method: str = 'loop'):
+  '''
+  Yields (pinion, gear, pinion AGMA, gear AGMA) for every combination
+  passing the AGMA analysis, as soon as it is found and in the order of
+  run_analysis. Consumers may stop iterating early.
 
-      if (reduce == False or interf == False):
+  cache: optional FactorCache, e.g. to inspect its hit/miss counters
+  method: 'loop' or 'prune'
+  (other arguments as in run_analysis)
+  '''
+  check_method(method, ITER_METHODS)
+  report = search_report(report)
+  search = iter_accepted_pruned if method == 'prune' else iter_accepted
+  for p, g, validp, validg in search(as_catalog(pinions), as_catalog(gears), St, Sc, n, Tmotor, index, report, cache):
+    yield pinions[p], gears[g], validp, validg
+
+def pair_scores(pinions: GearCatalog, gears: GearCatalog, ip, ig, key):
+  '''
+  Returns the score of every candidate pair known before the AGMA
+  analysis, lower is better
+
+  key: 'weight' (pinion + gear weight), 'center_distance' or a callable
+  key(pinion, gear) returning the score of a pair
+  '''
+  if (key == 'weight'):
+    return pinions.weight[ip] + gears.weight[ig]
+  elif (key == 'center_distance'):
+    return (pinions.dp[ip] + gears.dp[ig])/2
+  return np.array([key(pinions[p], gears[g]) for p, g in zip(ip.tolist(), ig.tolist())], dtype=float)
+
+def best_combinations(pinions, gears, St, Sc, n, Tmotor, index, k: int = 10, key = 'safety', report: SearchReport = None, cache: FactorCache = None):
+  '''
+  Returns the k best [pinion, gear] combinations passing the AGMA analysis
+  and their scores, best first, (combinations, scores)
+
+  The search keeps a bounded heap of the k best pairs found so far and
+  skips the candidates that cannot beat the k-th best:
+  - key='safety' ranks by the smaller safety factor of the pinion and the
+    gear (higher is better, the score is that safety factor). The pinion
+    safety factor bounds the pair's, so the gear is not checked when the
+    pinion alone cannot beat the k-th best.
+  - key='weight', 'center_distance' or a callable key(pinion, gear) ranks
+    by a score known before the AGMA analysis (lower is better). The
+    candidates are visited by increasing score and the search stops at
+    the first one no better than the k-th best.
+  Ties are broken by the run_analysis order, so the result is the head of
+  a full enumerate-then-sort.
+
+  k: number of combinations, at least 1
+  key: ranking, see above
+  cache: FactorCache shared by the AGMA evaluations (default: a new one)
+  (other arguments as in run_analysis)
+  '''
+  if (k < 1):
+    raise ValueError("k must be at least 1, got " + str(k))
+
+  report = search_report(report)
+  best, scores = best_pairs(as_catalog(pinions), as_catalog(gears), St, Sc, n, Tmotor, index, k, key, report, cache)
+
+  combinations = np.empty((len(best), 2), dtype=object)
+  combinations[:, 0] = [pinions[p] for p, _ in best]
+  combinations[:, 1] = [gears[g] for _, g in best]
+  return combinations, scores
+
+def best_pairs(pinions: GearCatalog, gears: GearCatalog, St, Sc, n, Tmotor, index, k: int = 10, key = 'safety', report: SearchReport = None, cache: FactorCache = None):
+  '''
+  Returns the (pinion index, gear index) of the k best pairs, best first,
+  and their scores, see best_combinations
+
+  cache: FactorCache shared by the AGMA evaluations (default: a new one)
+  '''
+  if (cache is None):
+    cache = FactorCache()
+  if (report is None):
+    report = SearchReport()
+
+  i, Rp, Rg, kd, phi = search_parameters(index)
+  ip, ig = candidate_pairs(pinions, gears, kd, phi, report)
+  thresh = 2
+
+  safety = isinstance(key, str) and key == 'safety'
+  if (safety == True):
+    order = np.arange(len(ip))
+    scores = None
+  else:
+    scores = pair_scores(pinions, gears, ip, ig, key)
+    order = np.argsort(scores, kind='stable')
+
+  # Max-heap of the k best (score, position), the k-th best on top
+  heap = []
+  for visited, j in enumerate(order.tolist()):
+    full = len(heap) == k
+
+    if (safety == False):
+      score = scores[j].item()
+      if (full == True and score >= -heap[0][0]):
+        # Every remaining candidate scores at least as much
+        report.skipped += 2*(len(order) - visited)
+        break
+
+    pinion = pinions[ip[j]]
+    gear = gears[ig[j]]
+
+    # 1) Check Pinion
+    validp = ag.agma(Rp, pinion, gear, n, Tmotor, St, Sc, index=i, cache=cache)
+    report.evaluated += 1
+    if (validp.valid(thresh) == False):
+      report.skipped += 1
+      continue
+
+    if (safety == True):
+      # The pair safety factor is at most the pinion's
+      score = -validp.safety_factor()
+      if (full == True and (score, j) >= (-heap[0][0], -heap[0][1])):
+        report.skipped += 1
         continue
-      
-      # First Iteration, Ng = 30
-      # Rg = 0.37
 
-      # 2nd Interation Define Min Geometry Factor Ng = 70
-      # Rg = 0.43
+    # 2) Check Gear
+    validg = ag.agma(Rg, pinion, gear, n, Tmotor, St, Sc, index=i+1, cache=cache)
+    report.evaluated += 1
+    if (validg.valid(thresh) == False):
+      continue
 
-      # 3rd Iteration
-      Rg = 0.45
+    if (safety == True):
+      score = -min(validp.safety_factor(), validg.safety_factor())
 
-      # Helical Gear, min geometry factor
-      # Rg = 0.5238
+    entry = (-score, -j)
+    if (full == False):
+      heapq.heappush(heap, entry)
+    elif (entry > heap[0]):
+      heapq.heapreplace(heap, entry)
 
-      # 1) Check Pinion
-      validp = ag.agma(Rp, pinion, gear, n, Tmotor, St, Sc, index=i)
+  best = sorted((-s, -j) for s, j in heap)
+  report.accepted += len(best)
 
-      # 2) Check Gear
-      validg = ag.agma(Rg, pinion, gear, n, Tmotor, St, Sc, index=i+1)
+  pairs = [(ip[j].item(), ig[j].item()) for _, j in best]
+  scores = np.array([-s if safety else s for s, _ in best], dtype=float)
+  return pairs, scores
+
+def accepted_pairs(pinions, gears, St, Sc, n, Tmotor, index, method: str = 'loop', report: SearchReport = None, block: int = BLOCK):
+  '''
+  Returns the pinion and gear indices of the combinations passing the
+  AGMA analysis, ordered by pinion then gear
+
+  With method='stream' the blocks of stream_pairs are concatenated, the
+  indices of every accepted pair are held at once.
+  (arguments as in run_analysis)
+  '''
+  check_method(method)
+  report = search_report(report)
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  if (method == 'batch'):
+    i, Rp, Rg, k, phi = search_parameters(index)
+    ip, ig = candidate_pairs(pinions, gears, k, phi, report)
+    return batch_analysis(pinions, gears, ip, ig, St, Sc, n, Tmotor, i, Rp, Rg, report)
+
+  if (method == 'kernel'):
+    i, Rp, Rg, k, phi = search_parameters(index)
+    ip, ig = candidate_pairs(pinions, gears, k, phi, report)
+    return kernel_analysis(pinions, gears, ip, ig, St, Sc, n, Tmotor, i, Rp, Rg, report)
+
+  if (method == 'stream'):
+    blocks = list(stream_pairs(pinions, gears, St, Sc, n, Tmotor, index, block, report))
+    ip = np.concatenate([b[0] for b in blocks] + [np.empty(0, dtype=np.intp)])
+    ig = np.concatenate([b[1] for b in blocks] + [np.empty(0, dtype=np.intp)])
+    return ip, ig
+
+  search = iter_accepted_pruned if method == 'prune' else iter_accepted
+
+  ip = []
+  ig = []
+  for p, g, _, _ in search(pinions, gears, St, Sc, n, Tmotor, index, report):
+    ip.append(p)
+    ig.append(g)
+
+  return np.array(ip, dtype=np.intp), np.array(ig, dtype=np.intp)
+
+def stream_pairs(pinions, gears, St, Sc, n, Tmotor, index, block: int = BLOCK, report: SearchReport = None):
+  '''
+  Yields the (ip, ig) indices of the accepted pairs block by block, in the
+  order of accepted_pairs, with memory bounded by block (see gears.stream)
+
+  block: max same-module pairs evaluated at once
+  (other arguments as in run_analysis)
+  '''
+  report = search_report(report)
+  i, Rp, Rg, k, phi = search_parameters(index)
+  yield from stream_analysis(as_catalog(pinions), as_catalog(gears), St, Sc, n, Tmotor, i, Rp, Rg, k, phi, block, report)
+
+def stream_combinations(pinions, gears, St, Sc, n, Tmotor, index, block: int = BLOCK, report: SearchReport = None):
+  '''
+  Yields the [pinion, gear] combinations of run_analysis as one array per
+  block of accepted pairs, for searches whose pairs do not fit in memory
+
+  (arguments as in stream_pairs)
+  '''
+  for ip, ig in stream_pairs(pinions, gears, St, Sc, n, Tmotor, index, block, report):
+    if (len(ip) == 0):
+      continue
+    combinations = np.empty((len(ip), 2), dtype=object)
+    combinations[:, 0] = [pinions[j] for j in ip]
+    combinations[:, 1] = [gears[j] for j in ig]
+    yield combinations
+
+def analysis_results(pinions, gears, St, Sc, n, Tmotor, index, report: SearchReport = None):
+  '''
+  Returns the pinion and gear indices of the combinations passing the
+  AGMA analysis and their results, an AGMABatch of shape (pairs, 2) with
+  the pinion results in column 0 and the gear results in column 1
+
+  (arguments as in run_analysis)
+  '''
+  report = search_report(report)
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  i, Rp, Rg, k, phi = search_parameters(index)
+  ip, ig = candidate_pairs(pinions, gears, k, phi, report)
+  return batch_analysis(pinions, gears, ip, ig, St, Sc, n, Tmotor, i, Rp, Rg, report, results=True)
+
+def batch_analysis(pinions, gears, ip, ig, St, Sc, n, Tmotor, i, Rp, Rg, report: SearchReport = None, results: bool = False):
+  '''
+  Vectorized AGMA check of the feasible pairs
+
+  pinions, gears: GearCatalog
+  ip, ig: pinion and gear indices of the feasible pairs
+  i: index of the pinion in the geartrain (1 or 3)
+  Rp, Rg: pinion and gear geometry factors
+  results: also return the AGMABatch of the accepted pairs, see
+  analysis_results
+  '''
+  pairp = pinions[ip]
+  pairg = gears[ig]
+
+  # Check Pinion & Gear
+  validp = agma_batch(Rp, pairp, pairg, n, Tmotor, St, Sc, index=i, cross=False)
+  validg = agma_batch(Rg, pairp, pairg, n, Tmotor, St, Sc, index=i+1, cross=False)
+
+  accepted = validp.valid(thresh=2) & validg.valid(thresh=2)
+
+  if (report is not None):
+    report.evaluated += 2*len(ip)
+    report.accepted += int(np.count_nonzero(accepted))
+
+  if (results == True):
+    return ip[accepted], ig[accepted], AGMABatch.stack(validp, validg).filter(accepted)
+  return ip[accepted], ig[accepted]
+
+def search_chunk(start, pinions, gears, St, Sc, n, Tmotor, index, method):
+  '''
+  Worker task: search a chunk of pinions starting at pinion index start
+  '''
+  report = SearchReport()
+  ip, ig = accepted_pairs(pinions, gears, St, Sc, n, Tmotor, index, method, report)
+  return ip + start, ig, report
+
+def parallel_pairs(pinions, gears, St, Sc, n, Tmotor, index, method: str = 'loop', report: SearchReport = None, workers: int = None, executor = None):
+  '''
+  Returns accepted_pairs computed over chunks of pinions in parallel
+
+  workers: number of processes (default: os.cpu_count()). With an
+  executor, the number of workers it runs, used to size the chunks
+  executor: optional executor, otherwise a ProcessPoolExecutor is created
+  '''
+  check_method(method)
+  owned = executor is None
+  if (owned == True):
+    executor = ProcessPoolExecutor(max_workers=workers)
+
+  # A few chunks per worker to balance uneven module groups
+  nchunks = 4*(workers or os.cpu_count())
+  bounds = np.linspace(0, len(pinions), min(nchunks, len(pinions)) + 1).astype(int)
+
+  try:
+    futures = [
+      executor.submit(search_chunk, start, pinions[start:stop], gears, St, Sc, n, Tmotor, index, method)
+      for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+    ]
+    # Merge in submission order, which is the serial pinion order
+    results = [future.result() for future in futures]
+  finally:
+    if (owned == True):
+      executor.shutdown()
 
-      if (validp.valid(thresh=2) == True and validg.valid(thresh=2) == True):
-        combination = np.array([[pinion, gear]])
-        combinations = np.vstack([combinations, combination])
+  if (report is not None):
+    for chunk in results:
+      report.merge(chunk[2])
 
-  combinations = combinations[1:, :]
-  return combinations
\ No newline at end of file
+  ip = np.concatenate([chunk[0] for chunk in results] + [np.empty(0, dtype=int)])
+  ig = np.concatenate([chunk[1] for chunk in results] + [np.empty(0, dtype=int)])
+  return ip, ig
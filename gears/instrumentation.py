@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from functools import wraps
+import time
+
+import gears.agma_factors as af
+from models.agma_results import AGMA
+from models.agma_batch_results import AGMABatch
+from models.pipeline_stats import PipelineStats
+
+# Result classes whose construction is timed
+RESULT_CLASSES = (AGMA, AGMABatch)
+
+# PipelineStats of the innermost active instrument() block, None when disabled
+active = None
+
+def factor_functions():
+  '''
+  Returns a dict of the functions defined in gears.agma_factors by name
+  '''
+  return {
+    name: value for name, value in vars(af).items()
+    if callable(value) and not isinstance(value, type) and getattr(value, '__module__', None) == af.__name__
+  }
+
+def timed(function, name, stats: PipelineStats):
+  '''
+  Returns function wrapped to record its calls and time in stats
+  '''
+  @wraps(function)
+  def wrapper(*args, **kwargs):
+    start = time.perf_counter()
+    try:
+      return function(*args, **kwargs)
+    finally:
+      stats.record(name, time.perf_counter() - start)
+  return wrapper
+
+def search_report(report):
+  '''
+  Returns report, or the SearchReport of the active instrumentation when
+  report is None
+  '''
+  if (report is None and active is not None):
+    return active.report
+  return report
+
+@contextmanager
+def instrument(stats: PipelineStats = None):
+  '''
+  Collect call counts and time of every gears.agma_factors function and of
+  the AGMA result construction, plus the pair search counters of
+  gears.gear_analysis, inside a with block:
+
+    with instrument() as stats:
+      run_analysis(...)
+    stats.print()
+
+  The factors are replaced by timed wrappers on the module for the
+  duration of the block only, so nothing is added to the calls outside of
+  it. Code binding a factor before the block (e.g. the NODES of
+  gears.agma_graph, a FactorCache built earlier) and worker processes
+  are not timed. Searches given an explicit report update that report
+  instead of stats.report.
+
+  stats: PipelineStats to accumulate into (default: a new one)
+  '''
+  global active
+  if (stats is None):
+    stats = PipelineStats()
+
+  functions = factor_functions()
+  inits = [(cls, cls.__init__) for cls in RESULT_CLASSES]
+  previous = active
+
+  for name, function in functions.items():
+    setattr(af, name, timed(function, name, stats))
+  for cls, init in inits:
+    cls.__init__ = timed(init, cls.__name__ + '.__init__', stats)
+  active = stats
+
+  try:
+    yield stats
+  finally:
+    active = previous
+    for name, function in functions.items():
+      setattr(af, name, function)
+    for cls, init in inits:
+      cls.__init__ = init
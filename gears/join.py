@@ -0,0 +1,51 @@
+import numpy as np
+from models.gear_catalog import GearCatalog, as_catalog
+from models.search_report import SearchReport
+
+def iter_module_groups(pinions: GearCatalog, gears: GearCatalog):
+  '''
+  Yields (module, pinion indices, gear indices) for every module found in
+  both catalogs, using the catalogs' module_index
+
+  pinions, gears: GearCatalog or sequences of Gear objects
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+  gear_groups = gears.module_index
+
+  for mod, ip in pinions.module_index.items():
+    ig = gear_groups.get(mod)
+    if (ig is not None):
+      yield mod, ip, ig
+
+def module_pairs(pinions: GearCatalog, gears: GearCatalog, report: SearchReport = None):
+  '''
+  Returns the pinion and gear indices (ip, ig) of every same-module pair,
+  ordered by pinion then gear, i.e. the order of a nested loop that skips
+  module mismatches
+
+  pinions, gears: GearCatalog or sequences of Gear objects
+  report: optional SearchReport, updated with the pairs removed by the join
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  ip = [np.empty(0, dtype=np.intp)]
+  ig = [np.empty(0, dtype=np.intp)]
+  for mod, p, g in iter_module_groups(pinions, gears):
+    ip.append(np.repeat(p, len(g)))
+    ig.append(np.tile(g, len(p)))
+
+  ip = np.concatenate(ip)
+  ig = np.concatenate(ig)
+
+  # Groups are built module by module, restore the pinion-major order
+  order = np.argsort(ip, kind='stable')
+  ip = ip[order]
+  ig = ig[order]
+
+  if (report is not None):
+    report.considered += len(pinions)*len(gears)
+    report.module += len(pinions)*len(gears) - len(ip)
+
+  return ip, ig
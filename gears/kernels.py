@@ -0,0 +1,226 @@
+import math
+import numpy as np
+import gears.agma_factors as af
+from gears.agma_batch import agma_batch
+from models.gear_catalog import as_catalog
+
+# Numba is optional, the NumPy batch path is used without it
+try:
+  import numba
+except ImportError:
+  numba = None
+
+def make_kernel(arg: str = 'metric', jit: bool = True):
+  '''
+  Returns a fused per-pair AGMA kernel for a unit system
+
+  The kernel computes the bending and contact safety factors and the
+  velocity check of gears.agma.agma for every aligned pinion/gear pair in
+  one loop, with the unit system fixed when the kernel is built so no
+  string is compared per pair. Factors out of range give NaN, like
+  gears.agma_batch.
+
+  kernel(R, mod, F, Np, dp, borep, Ng, dg, boreg, vp, vg, Ep, Eg, Hbp, Hbg,
+         Qvp, Qvg, nmin, Tmotor, St, Sc, index, phi_t, psi, S1, S,
+         M_min, Kr, lewis, Sf, Sh, exceeded)
+  fills the output arrays Sf, Sh and exceeded.
+
+  arg: 'metric' or 'us'
+  jit: compile the kernel with Numba, otherwise return the plain Python
+  loop (one pair at a time, to check the kernel without Numba)
+  '''
+  metric = arg == 'metric'
+
+  # Unit system constants
+  if (metric == True):
+    V_scale = 60000
+    Kv_scale = 200
+    Vmax_scale = 1/200
+    F_limits = (25, 432, 1020)
+    Cma_coefficients = (0.274, 0.657e-3, -1.186e-7)
+  else:
+    V_scale = 12
+    Kv_scale = 1
+    Vmax_scale = 1
+    F_limits = (1, 17, 40)
+    Cma_coefficients = (0.274, 0.0167, -0.765e-4)
+  F1, F2, F3 = F_limits
+  A_ma, B_ma, C_ma = Cma_coefficients
+
+  # After 1st gearset selection, values of gears.agma_factors.tangential_force
+  d1 = 150/1000
+  d2 = 350/1000
+
+  def kernel(R, mod, F, Np, dp, borep, Ng, dg, boreg, vp, vg, Ep, Eg, Hbp, Hbg, Qvp, Qvg,
+             nmin, Tmotor, St, Sc, index, phi_t, psi, S1, S, M_min, Kr, lewis, Sf, Sh, exceeded):
+    pinion = index == 1 or index == 3
+    phi = phi_t*math.pi/180
+    helix = psi*math.pi/180
+    Cpm = 1.0 if S1/S < 0.175 else 1.1
+
+    for j in range(len(Np)):
+      m = mod[j]
+      Fj = F[j]
+      mg = Ng[j]/Np[j]
+      if (pinion):
+        N = Np[j]
+        d = dp[j]
+        Qv = Qvp[j]
+        bore = borep[j]
+      else:
+        N = Ng[j]
+        d = dg[j]
+        Qv = Qvg[j]
+        bore = boreg[j]
+
+      # ss geometry factor
+      rp = dp[j]/2
+      rg = dg[j]/2
+      if (helix == 0):
+        mn = 1.0
+      else:
+        phi_n = math.atan(math.tan(phi)/math.cos(helix))
+        rbp = rp*math.cos(phi)
+        rbg = rg*math.cos(phi)
+        Z = ((rp + m)**2 - rbp**2)**.5 + ((rg + m)**2 - rbg**2)**.5 - (rp + rg)*math.sin(phi)
+        mn = math.pi*m*math.cos(phi_n)/(0.95*Z)
+      I = math.cos(phi)*math.sin(phi)*mg/(2*mn*(mg + 1))
+
+      # Elastic Coefficient
+      Cp = (1/(math.pi*((1-vp[j]**2)/Ep[j] + (1-vg[j]**2)/Eg[j])))**.5
+
+      # Pitch-Line velocity, max recommended velocity and Dynamic Factor
+      if (index == 4):
+        n = nmin
+      elif (index == 2 or index == 3):
+        n = mg*nmin
+      else:
+        n = mg**2*nmin
+      V = math.pi*d*n/V_scale
+      B = 0.25*(12-Qv)**(2/3)
+      A = 50+56*(1-B)
+      exceeded[j] = V > (A+Qv-3)**2*Vmax_scale
+      Kv = ((A + math.sqrt(Kv_scale*V))/A)**B
+
+      # Size Factor
+      Ni = int(N)
+      Y = lewis[Ni] if (Ni == N and Ni >= 0 and Ni < len(lewis)) else math.nan
+      Ks = 1.192*(Fj*math.sqrt(Y)/(N/d))**0.05035
+
+      # Load Distribution Factor
+      x = Fj/(10*d)
+      if (Fj <= F1):
+        Cpf = x - 0.025
+      elif (Fj <= F2):
+        Cpf = x - 0.0375 + 0.000492*Fj
+      elif (Fj <= F3):
+        Cpf = x - 0.1109 + 0.000815*Fj - 0.000000353*Fj**2
+      else:
+        Cpf = math.nan
+      Km = 1 + (Cpf*Cpm + A_ma + B_ma*Fj + C_ma*Fj**2)
+
+      # Hardness Ratio Factor
+      Ch = 1.0
+      if (not pinion):
+        r = Hbp[j]/Hbg[j]
+        if (r > 1.7):
+          Ch = math.nan
+        elif (r >= 1.2):
+          Ch = 1.0 + (8.98e-3*r-8.29e-3)*(mg - 1)
+
+      # Stress-Cycle Factors
+      cycles = M_min if index == 4 else mg**2*M_min
+      Yn = 1.3558*cycles**(-0.0178)
+      Zn = 1.4488*cycles**(-0.023)
+
+      # Rim Thickness Factor
+      mb = (d/2 - 1.25*m - bore/2)/(2.25*m)
+      Kb = 1.0 if mb >= 1.2 else 1.6*math.log(2.242/mb)
+
+      # Tangential Force
+      dm = d/1000
+      if (index == 1):
+        Wt = 2*Tmotor/dm
+      elif (index == 2):
+        Wt = 2*Tmotor/(dm*(1/mg))
+      else:
+        T3 = 2*Tmotor/d1*d2/2
+        Wt = 2*T3/dm if index == 3 else 2*T3/(dm/mg)
+
+      # Stresses and Safety Factors
+      sigma = Wt*Kv*Ks*(1/m)*Km*Kb/(Fj*R)
+      sigma_c = Cp*math.sqrt(Wt*Kv*Ks*Km/(dp[j]*Fj*I))
+      Sf[j] = St*Yn/Kr/sigma
+      Sh[j] = Sc*Zn*Ch/Kr/sigma_c
+
+  if (jit == True):
+    return numba.njit(cache=False)(kernel)
+  return kernel
+
+# Kernels built on first use, keyed by (unit system, backend)
+kernels = {}
+
+def kernel_safety(R, pinions, gears, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', backend: str = None):
+  '''
+  Returns the bending and contact safety factors and the velocity check of
+  aligned pinion/gear pairs, (Sf, Sh, exceeded)
+
+  backend: 'numba' runs the fused kernel of make_kernel, 'numpy' the
+  gears.agma_batch path, 'python' the fused kernel without compiling it
+  (slow, checks the kernel where Numba is missing). Default: 'numba' when
+  Numba is installed, 'numpy' otherwise. The kernel looks up the Lewis
+  factor at integer tooth counts, as stored by GearCatalog.
+  (remaining arguments as in gears.agma.agma)
+  '''
+  if (backend is None):
+    backend = 'numpy' if numba is None else 'numba'
+
+  if (backend == 'numpy'):
+    results = agma_batch(R, pinions, gears, nmin, Tmotor, St, Sc, index, psi, phi_t, S1, S, arg, cross=False)
+    return results.Sf, results.Sh, results.exceeded
+
+  if (backend == 'numba' and numba is None):
+    raise ImportError("The numba backend requires numba")
+  if (backend != 'numba' and backend != 'python'):
+    raise ValueError("Unknown kernel backend: " + repr(backend))
+
+  if ((arg, backend) not in kernels):
+    kernels[(arg, backend)] = make_kernel(arg, jit=backend == 'numba')
+
+  p = as_catalog(pinions).columns
+  g = as_catalog(gears).columns
+  Sf = np.empty(len(p['N']))
+  Sh = np.empty(len(p['N']))
+  exceeded = np.empty(len(p['N']), dtype=np.bool_)
+
+  columns = [np.ascontiguousarray(c, dtype=float) for c in (
+    p['mod'], p['F'], p['N'], p['dp'], p['bore'], g['N'], g['dp'], g['bore'],
+    p['v'], g['v'], p['E'], g['E'], p['H'], g['H'], p['Qv'], g['Qv'])]
+
+  kernels[(arg, backend)](float(R), *columns, float(nmin), float(Tmotor), float(St), float(Sc), int(index),
+                          float(phi_t), float(psi), float(S1), float(S), float(af.life_cycles()),
+                          float(af.reliability_factor(10)), af.lewis_Y_table, Sf, Sh, exceeded)
+  return Sf, Sh, exceeded
+
+def kernel_analysis(pinions, gears, ip, ig, St, Sc, n, Tmotor, i, Rp, Rg, report = None, backend: str = None):
+  '''
+  gears.gear_analysis.batch_analysis with the safety factors of
+  kernel_safety
+
+  backend: see kernel_safety
+  '''
+  pairp = pinions[ip]
+  pairg = gears[ig]
+
+  # Check Pinion & Gear
+  Sfp, Shp, exceededp = kernel_safety(Rp, pairp, pairg, n, Tmotor, St, Sc, i, backend=backend)
+  Sfg, Shg, exceededg = kernel_safety(Rg, pairp, pairg, n, Tmotor, St, Sc, i+1, backend=backend)
+
+  thresh = 2
+  accepted = (np.minimum(Sfp, Shp) >= thresh) & ~exceededp & (np.minimum(Sfg, Shg) >= thresh) & ~exceededg
+
+  if (report is not None):
+    report.evaluated += 2*len(ip)
+    report.accepted += int(np.count_nonzero(accepted))
+
+  return ip[accepted], ig[accepted]
@@ -0,0 +1,115 @@
+from functools import lru_cache
+import numpy as np
+import gears.agma_factors as af
+from gears.agma_batch import agma_arrays
+from gears.gear_analysis import search_parameters, candidate_pairs
+from models.damage_results import DamageResults
+from models.gear_catalog import as_catalog
+from models.load_spectrum import LoadSpectrum
+from models.search_report import SearchReport
+
+@lru_cache(maxsize=32)
+def drive_cycle_spectrum(Tmotor):
+  '''
+  Returns the LoadSpectrum of the driving cycle of gears.agma_factors
+  (DRIVE_CYCLE over VEHICLE_LIFE) at a constant motor torque, built once
+  per torque
+
+  Tmotor: motor torque (N*m)
+  '''
+  return LoadSpectrum(af.DRIVE_CYCLE[:, 0], af.DRIVE_CYCLE[:, 1], Tmotor, af.VEHICLE_LIFE, af.TIRE_DIAMETER)
+
+def gear_cycles(spectrum: LoadSpectrum, Np, Ng, index):
+  '''
+  Returns the load cycles of the gear at index in every bin, shape
+  (bins,) + broadcast shape of Np, Ng
+
+  spectrum: LoadSpectrum
+  index: position of the gear in the geartrain
+  '''
+  ndim = np.broadcast(Np, Ng).ndim
+  return spectrum.revolutions.reshape((-1,) + (1,)*ndim)*af.speed_ratio(Np, Ng, index)
+
+def spectrum_damage(R, pinion: dict, gear: dict, spectrum: LoadSpectrum, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', thresh=1):
+  '''
+  Returns the DamageResults of the gear at index over a load spectrum,
+  with Miner's rule on the stress-cycle curves of stress_cycle_factors
+
+  The AGMA factors are evaluated once for a unit output speed and motor
+  torque. Only the dynamic factor depends on the bin speed and the stresses
+  scale with the torque, so every bin costs a few array operations:
+    sigma = sigma(1)*T*Kv/Kv(1), sigma_c = sigma_c(1)*sqrt(T*Kv/Kv(1))
+  The stress-cycle factor reached by each bin stress gives its cycles to
+  failure (af.stress_cycle_life) and the damage sums cycles/cycles to
+  failure over the bins. A single bin of life_cycles() revolutions at
+  (nmin, Tmotor) has damage <= 1 exactly when gears.agma.agma passes,
+  except that the load cycles of gears 2 and 3 follow their shaft speed
+  (Ng/Np times the output) where stress_cycle_factors uses (Ng/Np)**2.
+
+  pinion, gear: columns of the pairs (see gears.agma_batch.agma_arrays)
+  spectrum: LoadSpectrum
+  thresh: design safety factor applied to the stresses
+  (remaining arguments as in gears.agma.agma)
+  '''
+  unit = agma_arrays(R, pinion, gear, 1, 1, St, Sc, index, psi, phi_t, S1, S, arg)
+
+  if (index == 1 or index == 3):
+    d = pinion['dp']
+    Qv = pinion['Qv']
+  else:
+    d = gear['dp']
+    Qv = gear['Qv']
+
+  Np = pinion['N']
+  Ng = gear['N']
+  shape = (-1,) + (1,)*unit.Sf.ndim
+
+  # Bin speeds and torques against the pairs
+  n = spectrum.n.reshape(shape)
+  T = spectrum.torque.reshape(shape)
+
+  V = af.pitch_line_velocity(Np, Ng, d, n, index, arg)
+  exceeded = np.any(V > af.max_recommended_velocity(Qv, arg), axis=0)
+  load = T*af.dynamic_factor(V, Qv, arg)/unit.Kv
+
+  # Stress-cycle factors reached in each bin
+  YN = thresh*unit.sigma*load*unit.Yn/unit.sigma_all_bending
+  ZN = thresh*unit.sigma_c*np.sqrt(load)*unit.Zn/unit.sigma_all_c
+  NY, NZ = af.stress_cycle_life(YN, ZN)
+
+  cycles = gear_cycles(spectrum, Np, Ng, index)
+  bending = np.sum(cycles/NY, axis=0)
+  contact = np.sum(cycles/NZ, axis=0)
+
+  return DamageResults(bending, contact, exceeded)
+
+def spectrum_analysis(pinions, gears, spectrum: LoadSpectrum, St, Sc, index, thresh=2, report: SearchReport = None):
+  '''
+  Returns the pinion and gear indices of the pairs surviving the load
+  spectrum, with the stresses scaled by the design safety factor thresh,
+  ordered by pinion then gear like run_analysis
+
+  Pinions and gears are rated in one vectorized pass over every bin and
+  every feasible pair.
+
+  spectrum: LoadSpectrum, e.g. drive_cycle_spectrum(Tmotor)
+  (remaining arguments as in gears.gear_analysis.run_analysis)
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  i, Rp, Rg, k, phi = search_parameters(index)
+  ip, ig = candidate_pairs(pinions, gears, k, phi, report)
+
+  pinion = pinions[ip].columns
+  gear = gears[ig].columns
+
+  with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+    accepted = spectrum_damage(Rp, pinion, gear, spectrum, St, Sc, i, thresh=thresh).valid()
+    accepted &= spectrum_damage(Rg, pinion, gear, spectrum, St, Sc, i+1, thresh=thresh).valid()
+
+  if (report is not None):
+    report.evaluated += 2*len(ip)
+    report.accepted += int(np.count_nonzero(accepted))
+
+  return ip[accepted], ig[accepted]
@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from gears.agma_batch import agma_arrays
+from gears.gear_analysis import search_parameters
+from models.gear_catalog import as_catalog
+from models.reliability_results import ReliabilityResults
+
+# Standard deviation of each scattered input: relative to the nominal value
+# for St, Sc, H (both gears), F (face width) and Tmotor, in quality numbers
+# for Qv (both gears)
+DEFAULT_SCATTER = {'St': 0.08, 'Sc': 0.06, 'H': 0.05, 'F': 0.01, 'Tmotor': 0.1, 'Qv': 0.5}
+
+# Range of the sampled quality numbers, the dynamic factor is not defined
+# above 12
+QV_RANGE = (3, 12)
+
+def sample_inputs(rng, shape, pinion, gear, St, Sc, Tmotor, scatter):
+  '''
+  Returns sampled (pinion, gear, St, Sc, Tmotor), arrays of shape
+  (samples, pairs)
+
+  rng: numpy Generator
+  shape: (samples, pairs)
+  pinion, gear: nominal columns of the pairs
+  '''
+  def relative(nominal, name):
+    if (scatter.get(name, 0) == 0):
+      return nominal
+    return nominal*(1 + scatter[name]*rng.standard_normal(shape))
+
+  def quality(nominal):
+    if (scatter.get('Qv', 0) == 0):
+      return nominal
+    return np.clip(nominal + scatter['Qv']*rng.standard_normal(shape), *QV_RANGE)
+
+  pinion = dict(pinion, H=relative(pinion['H'], 'H'), F=relative(pinion['F'], 'F'), Qv=quality(pinion['Qv']))
+  gear = dict(gear, H=relative(gear['H'], 'H'), Qv=quality(gear['Qv']))
+  return pinion, gear, relative(St, 'St'), relative(Sc, 'Sc'), relative(Tmotor, 'Tmotor')
+
+def sample_chunk(seed, samples, pinion, gear, St, Sc, nmin, Tmotor, index, scatter):
+  '''
+  Worker task: failure counts of the pairs over one chunk of samples
+
+  seed: numpy SeedSequence of the chunk
+  samples: number of samples in the chunk
+  '''
+  rng = np.random.default_rng(seed)
+  i, Rp, Rg, _, _ = search_parameters(index)
+  shape = (samples, pinion['N'].shape[-1])
+
+  p, g, St, Sc, Tmotor = sample_inputs(rng, shape, pinion, gear, St, Sc, Tmotor, scatter)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    validp = agma_arrays(Rp, p, g, nmin, Tmotor, St, Sc, i)
+    validg = agma_arrays(Rg, p, g, nmin, Tmotor, St, Sc, i+1)
+
+  # NaN factors count as failures, inputs without scatter broadcast
+  bending = np.broadcast_to(np.stack([~(validp.Sf >= 1), ~(validg.Sf >= 1)], axis=-1), shape + (2,))
+  contact = np.broadcast_to(np.stack([~(validp.Sh >= 1), ~(validg.Sh >= 1)], axis=-1), shape + (2,))
+  exceeded = np.broadcast_to(np.stack([validp.exceeded, validg.exceeded], axis=-1), shape + (2,))
+  failed = (bending | contact).any(axis=-1)
+
+  return bending.sum(axis=0), contact.sum(axis=0), exceeded.sum(axis=0), failed.sum(axis=0)
+
+def monte_carlo(pinions, gears, St, Sc, nmin, Tmotor, index, samples: int = 100000, scatter: dict = None, seed = 0, chunk: int = 2**20, workers: int = None, executor = None):
+  '''
+  Returns the ReliabilityResults of aligned pinion/gear pairs, e.g. the
+  columns of run_analysis combinations, under scatter of the inputs
+
+  Every sample draws St, Sc, the hardnesses, the face width, Tmotor and
+  the quality numbers around their nominal values (normal distributions,
+  see DEFAULT_SCATTER) and runs the AGMA analysis of the pinion and the
+  gear with gears.agma_batch. Samples are processed in chunks of at most
+  chunk samples x pairs, each with its own child of
+  numpy.random.SeedSequence(seed): the results only depend on seed,
+  samples and chunk, not on the number of workers.
+
+  pinions, gears: aligned pairs, GearCatalog or sequences of Gear
+  samples: number of samples per pair, at least 1
+  scatter: standard deviations by input name, missing inputs are not
+  scattered (default: DEFAULT_SCATTER)
+  seed: seed of the SeedSequence
+  chunk: max number of samples x pairs per chunk
+  workers: number of processes, chunks run in a ProcessPoolExecutor
+  executor: optional concurrent.futures executor to use instead
+  (other arguments as in run_analysis)
+  '''
+  if (samples < 1):
+    raise ValueError("samples must be at least 1, got " + str(samples))
+  if (scatter is None):
+    scatter = DEFAULT_SCATTER
+
+  pinion = {f: col[np.newaxis, :] for f, col in as_catalog(pinions).columns.items()}
+  gear = {f: col[np.newaxis, :] for f, col in as_catalog(gears).columns.items()}
+  pairs = pinion['N'].shape[1]
+
+  # Chunks of samples and their independent random streams
+  size = max(1, chunk//max(pairs, 1))
+  bounds = list(range(0, samples, size)) + [samples]
+  counts = np.diff(bounds).tolist()
+  seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+  tasks = [(s, c, pinion, gear, St, Sc, nmin, Tmotor, index, scatter) for s, c in zip(seeds, counts)]
+
+  if (workers is None and executor is None):
+    results = [sample_chunk(*task) for task in tasks]
+  else:
+    owned = executor is None
+    if (owned == True):
+      executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+      futures = [executor.submit(sample_chunk, *task) for task in tasks]
+      results = [future.result() for future in futures]
+    finally:
+      if (owned == True):
+        executor.shutdown()
+
+  bending = np.zeros((pairs, 2), dtype=np.int64)
+  contact = np.zeros((pairs, 2), dtype=np.int64)
+  exceeded = np.zeros((pairs, 2), dtype=np.int64)
+  failed = np.zeros(pairs, dtype=np.int64)
+  for b, c, e, f in results:
+    bending += b
+    contact += c
+    exceeded += e
+    failed += f
+
+  return ReliabilityResults(samples, bending, contact, exceeded, failed)
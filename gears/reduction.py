@@ -1,19 +1,14 @@
 # imports
 import numpy as np
 
-def valid_reduction(N1, N2):
+def max_geartrain_value(vmax=180, tdia=0.499, nmax=10000):
   '''
-  determines whether 2 gear gears achieve the desired reduction
+  Returns the max geartrain value for the speed envelope
 
-  N1: 1st and 3rd gear (driving) number of teeth
-  N2: 2nd and 4th gear (driven) number of teeth
+  vmax: car max speed, km/hr
+  tdia: tire diameter, m
+  nmax: motor max rotation speed
   '''
-  
-  # Design Inputs
-
-  vmax = 180 # car max speed, km/hr
-  tdia = 0.499 # tire diameter, m
-  nmax = 10000 # motor max rotation speed
 
   # Rotation speed of geartrain output
 
@@ -28,6 +23,22 @@ def valid_reduction(N1, N2):
   emax = nl/nf
   # print('Max geartrain value', emax)
 
+  return emax
+
+def valid_reduction(N1, N2, vmax=180, tdia=0.499, nmax=10000):
+  '''
+  determines whether 2 gear gears achieve the desired reduction
+
+  N1: 1st and 3rd gear (driving) number of teeth
+  N2: 2nd and 4th gear (driven) number of teeth
+  vmax = 180: car max speed, km/hr
+  tdia = 0.499: tire diameter, m
+  nmax = 10000: motor max rotation speed
+  '''
+
+  # Max Geartrain Value
+  emax = max_geartrain_value(vmax, tdia, nmax)
+
   # Actual Geartrain value
   e = (N1/N2)**2
   # print("Actual geartrain value", e)
@@ -38,4 +49,3 @@ def valid_reduction(N1, N2):
   
   else:
     return True
-
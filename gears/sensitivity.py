@@ -0,0 +1,158 @@
+import numpy as np
+import gears.agma_factors as af
+from gears.agma_batch import agma_arrays
+from models.gear_catalog import as_catalog
+from models.sensitivity_results import Sensitivity
+
+def agma_sensitivity(R, pinion: dict, gear: dict, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric', n=None, T=None, cycles=None):
+  '''
+  Returns the Sensitivity of the safety factors Sf and Sh of
+  gears.agma_batch.agma_arrays: their values and exact partial derivatives
+  with respect to
+    F: face width (the pinion's, used for the pair)
+    m: module
+    dp, dg: pinion and gear pitch diameters
+    Hp, Hg: pinion and gear Brinell hardnesses
+    Qv: quality number of the analyzed gear
+    Tmotor: motor torque (T when given)
+    n: geartrain output speed nmin (n when given)
+
+  The derivatives are built in the same pass with the chain rule through
+  the logarithm of each factor:
+    ln Sf = ln St Yn/(Kt Kr) - ln Wt Ko Kv Ks Km Kb/J + ln m + ln F
+    ln Sh = ln Sc Zn Ch/(Kt Kr) - 1/2 ln Wt Ko Kv Ks Km Cf/(dp F I) - ln Cp
+  so dS/dx = S * d(ln S)/dx. Derivatives are taken on the smooth branch of
+  the tabulated factors (Km, Kb, Ch); the velocity check is not
+  differentiable. dKv/dQv is infinite at Qv = 12.
+
+  pinion, gear: columns of the pairs (see gears.agma_batch.agma_arrays)
+  (remaining arguments as in gears.agma.agma)
+  '''
+  with np.errstate(invalid='ignore', divide='ignore'):
+    results = agma_arrays(R, pinion, gear, nmin, Tmotor, St, Sc, index, psi, phi_t, S1, S, arg, n, T, cycles)
+
+    m = pinion['mod']
+    F = pinion['F']
+    Np = pinion['N']
+    Ng = gear['N']
+    dp = pinion['dp']
+    dg = gear['dp']
+    Hbp = pinion['H']
+    Hbg = gear['H']
+
+    analyzed_pinion = index == 1 or index == 3
+    if (analyzed_pinion == True):
+      d = dp
+      Qv = pinion['Qv']
+      bore = pinion['bore']
+    else:
+      d = dg
+      Qv = gear['Qv']
+      bore = gear['bore']
+
+    speed = nmin if n is None else n
+    torque = Tmotor if T is None else T
+
+    # Dynamic Factor, Kv = ((A + sqrt(c V))/A)**B with V ~ d*n
+    c = 200 if arg == 'metric' else 1
+    V = af.pitch_line_velocity(Np, Ng, d, nmin, index, arg, n)
+    B = 0.25*(12-Qv)**(2/3)
+    A = 50+56*(1-B)
+    s = np.sqrt(c*V)
+    Kv_V = B*s/(2*(A + s)) # d ln Kv / d ln V
+    dB = -(1/6)*(12-Qv)**(-1/3)
+    Kv_Qv = dB*np.log((A + s)/A) + B*(-56*dB)*(1/(A + s) - 1/A)
+
+    # Size Factor, Ks ~ (F*d)**0.05035
+    Ks_F = 0.05035/F
+    Ks_d = 0.05035/d
+
+    # Load Distribution Factor, Km = 1 + Cpf*Cpm + Cma
+    if (arg == 'metric'):
+      limits = (25, 432, 1020)
+      Bm, Cm = 0.657e-3, -1.186e-7
+    else:
+      limits = (1, 17, 40)
+      Bm, Cm = 0.0167, -0.765e-4
+    Cpm = np.where(np.asarray(S1)/S < 0.175, 1, 1.1)
+    Cpf_F = 1/(10*d) + np.select(
+      [F <= limits[0], F <= limits[1], F <= limits[2]],
+      [0, 0.000492, 0.000815 - 2*0.000000353*F], np.nan)
+    Cpf_d = -F/(10*d**2)
+    Km_F = (Cpm*Cpf_F + Bm + 2*Cm*F)/results.Km
+    Km_d = Cpm*Cpf_d/results.Km
+
+    # Rim Thickness Factor, Kb = 1.6 ln(2.242/mb) below mb = 1.2
+    ht = 2.25*m
+    mb = (d/2 - 1.25*m - bore/2)/ht
+    Kb_mb = np.where(mb < 1.2, -1.6/(mb*results.Kb), 0)
+    Kb_d = Kb_mb/(2*ht)
+    Kb_m = Kb_mb*(-1.25 - 2.25*mb)/ht
+
+    # ss geometry factor, I ~ 1/mn with mn = pi m cos(phi_n)/(0.95 Z) for helical gears
+    if (psi == 0):
+      I_m = I_dp = I_dg = 0
+    else:
+      phi = phi_t*np.pi/180
+      rp = dp/2
+      rg = dg/2
+      q1 = np.sqrt((rp + m)**2 - (rp*np.cos(phi))**2)
+      q2 = np.sqrt((rg + m)**2 - (rg*np.cos(phi))**2)
+      Z = q1 + q2 - (rp + rg)*np.sin(phi)
+      Z_m = (rp + m)/q1 + (rg + m)/q2
+      Z_dp = 0.5*((rp + m) - rp*np.cos(phi)**2)/q1 - 0.5*np.sin(phi)
+      Z_dg = 0.5*((rg + m) - rg*np.cos(phi)**2)/q2 - 0.5*np.sin(phi)
+      I_m = -(1/m - Z_m/Z)
+      I_dp = Z_dp/Z
+      I_dg = Z_dg/Z
+
+    # Hardness Ratio Factor, gears only
+    r = Hbp/Hbg
+    if (analyzed_pinion == True):
+      Ch_r = 0
+    else:
+      Ch_r = np.where((r >= 1.2) & (r <= 1.7), 8.98e-3*(Ng/Np - 1)/results.Ch, 0)
+    Ch_Hp = Ch_r/Hbg
+    Ch_Hg = -Ch_r*Hbp/Hbg**2
+
+    # Analyzed pitch diameter: Wt ~ 1/d, V ~ d
+    Sf_d = 1/d - Kv_V/d - Ks_d - Km_d - Kb_d
+    Sh_d = -0.5*(-1/d + Kv_V/d + Ks_d + Km_d)
+
+    lnSf = {
+      'F': 1/F - Ks_F - Km_F,
+      'm': 1/m - Kb_m,
+      'dp': Sf_d if analyzed_pinion else 0,
+      'dg': 0 if analyzed_pinion else Sf_d,
+      'Hp': 0,
+      'Hg': 0,
+      'Qv': -Kv_Qv,
+      'Tmotor': -1/torque,
+      'n': -Kv_V/speed,
+    }
+    lnSh = {
+      'F': -0.5*(Ks_F + Km_F - 1/F),
+      'm': 0.5*I_m,
+      'dp': (Sh_d if analyzed_pinion else 0) + 0.5/dp + 0.5*I_dp,
+      'dg': (0 if analyzed_pinion else Sh_d) + 0.5*I_dg,
+      'Hp': Ch_Hp,
+      'Hg': Ch_Hg,
+      'Qv': -0.5*Kv_Qv,
+      'Tmotor': -0.5/torque,
+      'n': -0.5*Kv_V/speed,
+    }
+
+    dSf = {name: results.Sf*value for name, value in lnSf.items()}
+    dSh = {name: results.Sh*value for name, value in lnSh.items()}
+
+  return Sensitivity(results.Sf, results.Sh, dSf, dSh)
+
+def sensitivity(R, pinions, gears, nmin, Tmotor, St, Sc, index, psi=0, phi_t=20, S1 = 1, S = 1, arg: str = 'metric'):
+  '''
+  Returns the Sensitivity of aligned pinion/gear pairs, see agma_sensitivity
+
+  pinions, gears: aligned pairs, GearCatalog or sequences of Gear
+  '''
+  pinion = as_catalog(pinions).columns
+  gear = as_catalog(gears).columns
+  return agma_sensitivity(R, pinion, gear, nmin, Tmotor, St, Sc, index, psi, phi_t, S1, S, arg)
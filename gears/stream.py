@@ -0,0 +1,106 @@
+import numpy as np
+from gears.agma_batch import agma_arrays
+from gears.feasibility import feasible_pairs
+from models.gear_catalog import GearCatalog
+from models.search_report import SearchReport
+
+# Default number of same-module pairs per block
+BLOCK = 2**18
+
+def pair_blocks(pinions: GearCatalog, gears: GearCatalog, block: int = BLOCK, report: SearchReport = None):
+  '''
+  Yields the (ip, ig) indices of every same-module pair in blocks of at
+  most block pairs, in the order of gears.join.module_pairs (by pinion,
+  then gear), without building the full pair list
+
+  Pair q of the sequence belongs to the pinion j whose cumulative count of
+  same-module gears passes q, its gear is the (q - first pair of j)-th
+  gear of the module. The yielded arrays are views of buffers reused by
+  the next block.
+
+  pinions, gears: GearCatalog
+  block: max pairs per block
+  report: optional SearchReport, updated with the pairs removed by the join
+  '''
+  groups = gears.module_index
+
+  # Gear rows grouped by module and the start of every module group
+  modules = np.array(sorted(groups), dtype=np.float64)
+  order = np.concatenate([groups[mod] for mod in modules.tolist()] + [np.empty(0, dtype=np.intp)])
+  sizes = np.array([len(groups[mod]) for mod in modules.tolist()], dtype=np.int64)
+  starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+
+  # Module group of every pinion, pinions without a matching module get 0 pairs
+  if (len(modules) == 0):
+    group = np.zeros(len(pinions), dtype=np.intp)
+    counts = np.zeros(len(pinions), dtype=np.int64)
+  else:
+    group = np.minimum(np.searchsorted(modules, pinions.mod), len(modules) - 1)
+    counts = np.where(modules[group] == pinions.mod, sizes[group], 0)
+  ends = np.cumsum(counts)
+  total = int(ends[-1]) if len(ends) > 0 else 0
+
+  if (report is not None):
+    report.considered += len(pinions)*len(gears)
+    report.module += len(pinions)*len(gears) - total
+
+  base = np.arange(block, dtype=np.int64)
+  position = np.empty(block, dtype=np.int64)
+  ip = np.empty(block, dtype=np.intp)
+  ig = np.empty(block, dtype=np.intp)
+
+  for start in range(0, total, block):
+    size = min(block, total - start)
+    q = np.add(base[:size], start, out=position[:size])
+    p = ip[:size]
+    p[:] = np.searchsorted(ends, q, side='right')
+    # Offset within the module group, then gear row
+    np.subtract(q, ends[p] - counts[p], out=q)
+    np.add(q, starts[group[p]], out=q)
+    g = np.take(order, q, out=ig[:size])
+    yield p, g
+
+def stream_analysis(pinions: GearCatalog, gears: GearCatalog, St, Sc, n, Tmotor, i, Rp, Rg, k, phi, block: int = BLOCK, report: SearchReport = None):
+  '''
+  Yields the (ip, ig) indices of the pairs passing the AGMA analysis, one
+  block of same-module pairs at a time
+
+  Each block is checked for reduction & interference, and the feasible
+  pairs are gathered into column buffers allocated once for the search
+  and evaluated with gears.agma_batch.agma_arrays. Scratch memory only
+  depends on block, not on the catalog sizes.
+
+  pinions, gears: GearCatalog
+  i: index of the pinion in the geartrain (1 or 3)
+  Rp, Rg: pinion and gear geometry factors
+  k: tooth depth factor
+  phi: pressure angle (deg)
+  block: max pairs per block
+  '''
+  pinion_columns = pinions.columns
+  gear_columns = gears.columns
+  pinion_buffers = {f: np.empty(block, dtype=col.dtype) for f, col in pinion_columns.items()}
+  gear_buffers = {f: np.empty(block, dtype=col.dtype) for f, col in gear_columns.items()}
+
+  for ip, ig in pair_blocks(pinions, gears, block, report):
+    feasible = feasible_pairs(pinions.N[ip], gears.N[ig], phi, k, report=report)
+    ip = ip[feasible]
+    ig = ig[feasible]
+    size = len(ip)
+    if (size == 0):
+      continue
+
+    p = {f: np.take(col, ip, out=pinion_buffers[f][:size]) for f, col in pinion_columns.items()}
+    g = {f: np.take(col, ig, out=gear_buffers[f][:size]) for f, col in gear_columns.items()}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+      validp = agma_arrays(Rp, p, g, n, Tmotor, St, Sc, i)
+      validg = agma_arrays(Rg, p, g, n, Tmotor, St, Sc, i+1)
+
+    accepted = validp.valid(thresh=2) & validg.valid(thresh=2)
+
+    if (report is not None):
+      report.evaluated += 2*size
+      report.accepted += int(np.count_nonzero(accepted))
+
+    yield ip[accepted], ig[accepted]
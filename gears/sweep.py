@@ -0,0 +1,94 @@
+import numpy as np
+from gears.agma_batch import agma_arrays
+from gears.gear_analysis import search_parameters, candidate_pairs
+from models.gear_catalog import as_catalog
+from models.sweep_results import SweepResults, SWEEP_AXES
+
+def unit_safety(pinions, gears, ip, ig, nmin, index, phi_t):
+  '''
+  Returns the pair bending and contact safety factors for unit St, Sc and
+  Tmotor, and the velocity check, at every nmin value, shape (len(nmin), K)
+
+  Both the pinion and the gear of the pair are checked, the pair safety
+  factors are the smaller of the two.
+  '''
+  i, Rp, Rg, _, _ = search_parameters(index)
+  pinion = {f: col[np.newaxis, :] for f, col in pinions[ip].columns.items()}
+  gear = {f: col[np.newaxis, :] for f, col in gears[ig].columns.items()}
+  n = nmin[:, np.newaxis]
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    validp = agma_arrays(Rp, pinion, gear, n, 1, 1, 1, i, phi_t=phi_t)
+    validg = agma_arrays(Rg, pinion, gear, n, 1, 1, 1, i+1, phi_t=phi_t)
+
+  Sf = np.minimum(validp.Sf, validg.Sf)
+  Sh = np.minimum(validp.Sh, validg.Sh)
+  exceeded = validp.exceeded | validg.exceeded
+  return Sf, Sh, exceeded
+
+def sweep(pinions, gears, index, St, Sc, Tmotor, nmin, phi_t=20, thresh=2, chunk: int = 2**22):
+  '''
+  Returns the SweepResults of the AGMA analysis of the catalog over a grid
+  of inputs, in one broadcast computation
+
+  Every input is a scalar or a 1-D array of values; the result has one
+  dimension per input, in the order St, Sc, Tmotor, nmin, phi_t, thresh.
+  A grid cell counts the pairs run_analysis would accept with those inputs.
+
+  The allowable stresses scale the safety factors linearly (Sf ~ St,
+  Sh ~ Sc) and the motor torque scales the stresses (Sf ~ 1/Tmotor,
+  Sh ~ 1/sqrt(Tmotor)), so the AGMA factors are only evaluated once per
+  (nmin, phi_t) and every other axis is a broadcast multiply. phi_t is
+  also the pressure angle of the interference check.
+
+  index: position of gear in geartrain (selects the gearset)
+  St: allowable bending stress (MPa)
+  Sc: allowable contact stress (MPa)
+  Tmotor: motor torque (N*m)
+  nmin: geartrain output rotation speed (rpm)
+  phi_t: pressure angle (deg)
+  thresh: minimum safety factor
+  chunk: max number of grid cells x pairs held in memory at once
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  values = [np.atleast_1d(np.asarray(v, dtype=float)) for v in (St, Sc, Tmotor, nmin, phi_t, thresh)]
+  axes = dict(zip(SWEEP_AXES, values))
+  St, Sc, Tmotor, nmin, phi_t, thresh = values
+  shape = tuple(len(v) for v in values)
+
+  count = np.zeros(shape, dtype=np.int64)
+  best = np.full(shape, np.nan)
+  worst = np.full(shape, np.nan)
+  pairs = np.zeros(len(phi_t), dtype=np.int64)
+
+  # Grid factors, axes (St, Sc, Tmotor, nmin, thresh, pair)
+  bending = (St[:, None, None] / Tmotor[None, None, :])[:, :, :, None, None, None]
+  contact = (Sc[None, :, None] / np.sqrt(Tmotor)[None, None, :])[:, :, :, None, None, None]
+  limit = thresh[None, None, None, None, :, None]
+
+  cells = int(np.prod(shape))//len(phi_t)
+  step = max(1, chunk//max(cells, 1))
+
+  _, _, _, k, _ = search_parameters(index)
+  for a, phi in enumerate(phi_t.tolist()):
+    ip, ig = candidate_pairs(pinions, gears, k, phi)
+    pairs[a] = len(ip)
+
+    for start in range(0, len(ip), step):
+      Sf, Sh, exceeded = unit_safety(pinions, gears, ip[start:start+step], ig[start:start+step], nmin, index, phi)
+
+      # Pair safety factor on the grid, NaN when the velocity is exceeded
+      Sf = np.where(exceeded, np.nan, Sf)[None, None, None, :, None, :]
+      Sh = np.where(exceeded, np.nan, Sh)[None, None, None, :, None, :]
+      safety = np.minimum(bending*Sf, contact*Sh)
+
+      count[:, :, :, :, a, :] += np.count_nonzero(safety >= limit, axis=-1)
+
+      # Safety factors do not depend on thresh
+      safety = safety[:, :, :, :, 0, :]
+      best[:, :, :, :, a, :] = np.fmax(best[:, :, :, :, a, :], np.fmax.reduce(safety, axis=-1, initial=np.nan)[..., None])
+      worst[:, :, :, :, a, :] = np.fmin(worst[:, :, :, :, a, :], np.fmin.reduce(safety, axis=-1, initial=np.nan)[..., None])
+
+  return SweepResults(axes, count, best, worst, pairs)
@@ -0,0 +1,122 @@
+from math import gcd
+import numpy as np
+from gears.reduction import max_geartrain_value
+from gears.train_synthesis import stage_candidates
+from gears.gear_analysis import search_parameters
+from gears.agma_batch import agma_arrays
+from models.gear_catalog import as_catalog
+from models.gear_train import GearStage, GearTrain
+from models.search_report import SearchReport
+
+def stage_safety(Rp, Rg, pinion, gear, St, Sc, n, T, cycles, r):
+  '''
+  Returns the bending and contact safety factors and the velocity check of
+  every candidate pair of a stage, pinion and gear combined
+
+  pinion, gear: columns of the candidate pairs
+  n, T, cycles: pinion operating point, the gear runs at n/r, T*r, cycles/r
+  r: stage speed ratios Ng/Np of the candidate pairs
+  '''
+  with np.errstate(invalid='ignore', divide='ignore'):
+    validp = agma_arrays(Rp, pinion, gear, None, None, St, Sc, 1, n=n, T=T, cycles=cycles)
+    validg = agma_arrays(Rg, pinion, gear, None, None, St, Sc, 2, n=n/r, T=T*r, cycles=cycles/r)
+
+  Sf = np.minimum(validp.Sf, validg.Sf)
+  Sh = np.minimum(validp.Sh, validg.Sh)
+  exceeded = validp.exceeded | validg.exceeded
+  return Sf, Sh, exceeded
+
+def iter_gear_trains(pinions, gears, stages, St, Sc, nmotor, Tmotor, cycles, thresh=2, report: SearchReport = None):
+  '''
+  Yields every GearTrain of the given number of stages passing the AGMA
+  analysis, depth-first from the motor
+
+  Speeds, torques and load cycles propagate stage by stage from the motor:
+  the pinion of stage s + 1 turns with the gear of stage s, at n/r with
+  torque T*r. A partial train is dropped as soon as a stage fails its
+  safety or velocity check, or when even the largest stage ratio left
+  cannot bring the train inside the reduction envelope of gears.reduction.
+
+  Stage results only depend on the partial train through its overall
+  ratio, so every stage is evaluated once per distinct ratio reached.
+
+  pinions, gears: GearCatalog or sequences of Gear, used for every stage
+  stages: number of stages
+  nmotor: motor rotation speed (rpm)
+  Tmotor: motor torque (N*m)
+  cycles: motor number of revolutions over the vehicle life
+  thresh: minimum safety factor
+  report: optional SearchReport. considered counts the stage pairs tried on
+  partial trains, reduction those cut by the envelope, feasible those
+  passing, evaluated the AGMA evaluations and accepted the trains
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+
+  if (report is None):
+    report = SearchReport()
+
+  _, Rp, Rg, k, phi = search_parameters(1)
+  emax = max_geartrain_value()
+
+  # Candidate pairs, same for every stage
+  ip, ig, r = stage_candidates(pinions, gears, phi, k)
+  pinion = pinions[ip].columns
+  gear = gears[ig].columns
+  Np = pinions.N[ip].tolist()
+  Ng = gears.N[ig].tolist()
+  rmax = r.max(initial=0)
+
+  # Stage results at every overall ratio reached, keyed by the exact ratio
+  memo = {}
+
+  def extend(depth, num, den, train):
+    # Operating point of this stage's pinion
+    ratio = num/den
+    n = nmotor/ratio
+    T = Tmotor*ratio
+    c = cycles/ratio
+
+    key = (num, den)
+    if (key not in memo):
+      Sf, Sh, exceeded = stage_safety(Rp, Rg, pinion, gear, St, Sc, n, T, c, r)
+      memo[key] = (Sf, Sh, (np.minimum(Sf, Sh) >= thresh) & ~exceeded)
+      report.evaluated += 2*len(r)
+    else:
+      report.skipped += 2*len(r)
+    Sf, Sh, valid = memo[key]
+
+    # Smallest geartrain value the remaining stages can still reach
+    remaining = stages - depth - 1
+    reach = (1/(ratio*r))*(1/rmax)**remaining <= emax
+
+    report.considered += len(r)
+    report.reduction += int(np.count_nonzero(~reach))
+    survivors = np.flatnonzero(valid & reach)
+    report.feasible += len(survivors)
+
+    for j in survivors.tolist():
+      stage = GearStage(pinions[ip[j]], gears[ig[j]], n, T, c, Sf[j].item(), Sh[j].item())
+      num2 = num*Ng[j]
+      den2 = den*Np[j]
+      divisor = gcd(num2, den2)
+      if (remaining == 0):
+        report.accepted += 1
+        yield GearTrain(train + [stage])
+      else:
+        yield from extend(depth + 1, num2//divisor, den2//divisor, train + [stage])
+
+  if (stages > 0 and len(r) > 0):
+    yield from extend(0, 1, 1, [])
+
+def search_gear_trains(pinions, gears, stages, St, Sc, nmotor, Tmotor, cycles, thresh=2, report: SearchReport = None):
+  '''
+  Returns the [gear 1, gear 2, ..., gear 2*stages] trains passing the AGMA
+  analysis, see iter_gear_trains
+  '''
+  trains = [train.gears() for train in iter_gear_trains(pinions, gears, stages, St, Sc, nmotor, Tmotor, cycles, thresh, report)]
+
+  combinations = np.empty((len(trains), 2*stages), dtype=object)
+  for row, train in enumerate(trains):
+    combinations[row] = train
+  return combinations
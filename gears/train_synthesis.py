@@ -0,0 +1,119 @@
+import numpy as np
+import gears.agma_factors as af
+from gears.agma_batch import agma_arrays
+from gears.feasibility import feasibility_table
+from gears.join import module_pairs
+from gears.reduction import max_geartrain_value
+from gears.gear_analysis import search_parameters
+from models.gear_catalog import GearCatalog, as_catalog
+from models.search_report import SearchReport
+
+def stage_candidates(pinions: GearCatalog, gears: GearCatalog, phi, k):
+  '''
+  Returns the pinion and gear indices of the same-module pairs without
+  interference, and their speed ratio Ng/Np
+
+  The reduction is checked on the whole train, not per stage.
+  '''
+  ip, ig = module_pairs(pinions, gears)
+
+  Np = pinions.N[ip]
+  Ng = gears.N[ig]
+  _, interf = feasibility_table(int(max(Np.max(initial=0), Ng.max(initial=0))), phi, k)
+  feasible = interf[Np, Ng]
+
+  ip = ip[feasible]
+  ig = ig[feasible]
+  return ip, ig, gears.N[ig]/pinions.N[ip]
+
+def stage_valid(R, pinions, gears, ip, ig, nmin, St, Sc, index, n, T, cycles, thresh):
+  '''
+  Returns the AGMA validity of the stage pairs (ip, ig) at every operating
+  point in n, T, cycles (arrays of shape (U, 1)), shape (U, len(ip))
+  '''
+  pinion = {f: col[np.newaxis, :] for f, col in pinions[ip].columns.items()}
+  gear = {f: col[np.newaxis, :] for f, col in gears[ig].columns.items()}
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    results = agma_arrays(R, pinion, gear, nmin, None, St, Sc, index, n=n, T=T, cycles=cycles)
+
+  return results.valid(thresh)
+
+def synthesize_two_stage(pinions, gears, St, Sc, nmin, Tmotor, thresh=2, pinions2=None, gears2=None, report: SearchReport = None):
+  '''
+  Returns the [gear 1, gear 2, gear 3, gear 4] trains whose both stages
+  pass the AGMA analysis, searched jointly
+
+  Each stage is rated with the speeds, torques and load cycles of the
+  actual train: with stage ratios r1 = N2/N1 and r2 = N4/N3 and the
+  output at nmin,
+    gear 1: n = nmin*r1*r2, T = Tmotor
+    gear 2, gear 3: n = nmin*r2, T = Tmotor*r1
+    gear 4: n = nmin, T = Tmotor*r1*r2
+  and load cycles scaled from af.life_cycles() by n/nmin. The train must
+  meet the reduction envelope of gears.reduction: 1/(r1*r2) <= emax.
+
+  Stage 1 results only depend on stage 2 through r2, and stage 2 results
+  on stage 1 through r1, so each stage is evaluated once per distinct
+  ratio of the other stage (memoized over ratios) rather than once per
+  train.
+
+  pinions, gears: stage 1 catalogs (GearCatalog or sequences of Gear)
+  pinions2, gears2: stage 2 catalogs (default: same as stage 1)
+  thresh: minimum safety factor
+  report: optional SearchReport. considered counts the trains, evaluated
+  the AGMA evaluations and skipped those a train-by-train search needs on top
+  '''
+  pinions = as_catalog(pinions)
+  gears = as_catalog(gears)
+  pinions2 = pinions if pinions2 is None else as_catalog(pinions2)
+  gears2 = gears if gears2 is None else as_catalog(gears2)
+
+  if (report is None):
+    report = SearchReport()
+
+  _, Rp, Rg, k, phi = search_parameters(1)
+  M_min = af.life_cycles()
+  emax = max_geartrain_value()
+
+  # Candidate pairs of each stage
+  ip1, ig1, r1 = stage_candidates(pinions, gears, phi, k)
+  ip3, ig4, r2 = stage_candidates(pinions2, gears2, phi, k)
+
+  # Distinct ratios, u1[a] is the ratio index of stage 1 pair a
+  R1, u1 = np.unique(r1, return_inverse=True)
+  R2, u2 = np.unique(r2, return_inverse=True)
+  R1 = R1[:, np.newaxis]
+  R2 = R2[:, np.newaxis]
+
+  # Stage 1 at every distinct stage 2 ratio, shape (len(R2), len(ip1))
+  n1 = nmin*r1*R2
+  valid1 = stage_valid(Rp, pinions, gears, ip1, ig1, nmin, St, Sc, 1, n1, Tmotor, M_min*n1/nmin, thresh)
+  valid1 &= stage_valid(Rg, pinions, gears, ip1, ig1, nmin, St, Sc, 2, nmin*R2, Tmotor*r1, M_min*R2, thresh)
+
+  # Stage 2 at every distinct stage 1 ratio, shape (len(R1), len(ip3))
+  valid2 = stage_valid(Rp, pinions2, gears2, ip3, ig4, nmin, St, Sc, 3, nmin*r2, Tmotor*R1, M_min*r2, thresh)
+  valid2 &= stage_valid(Rg, pinions2, gears2, ip3, ig4, nmin, St, Sc, 4, nmin, Tmotor*R1*r2, M_min, thresh)
+
+  report.considered += len(ip1)*len(ip3)
+  report.evaluated += 2*valid1.size + 2*valid2.size
+  report.skipped += max(0, 4*len(ip1)*len(ip3) - 2*valid1.size - 2*valid2.size)
+
+  # Combine, one stage 1 pair at a time
+  trains = []
+  for a in range(len(ip1)):
+    ok = valid1[u2, a] & valid2[u1[a]]
+
+    # Reduction envelope of the whole train
+    ok &= 1/(r1[a]*r2) <= emax
+    report.reduction += int(np.count_nonzero(valid1[u2, a] & valid2[u1[a]] & ~ok))
+
+    for b in np.flatnonzero(ok):
+      trains.append((ip1[a], ig1[a], ip3[b], ig4[b]))
+
+  report.accepted += len(trains)
+
+  combinations = np.empty((len(trains), 4), dtype=object)
+  for row, (a, b, c, d) in enumerate(trains):
+    combinations[row] = [pinions[a], gears[b], pinions2[c], gears2[d]]
+  return combinations
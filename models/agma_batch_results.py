@@ -0,0 +1,119 @@
+import numpy as np
+from models.agma_results import AGMA
+
+# Fields of models.agma_results.AGMA, in constructor order
+FIELDS = ('J', 'I', 'Cp', 'Kv', 'Ko', 'Cf', 'Ks', 'Km', 'Ch', 'Yn', 'Zn', 'Kr', 'Kt', 'Kb', 'Wt', 'Wr',
+          'sigma', 'sigma_all_bending', 'sigma_c', 'sigma_all_c', 'Sf', 'Sh', 'exceeded')
+
+# One record per result, 177 bytes
+AGMA_DTYPE = np.dtype([(name, np.float64) for name in FIELDS[:-1]] + [('exceeded', np.bool_)])
+
+class AGMARow:
+  __slots__ = ('record',)
+
+  def __init__(self, record):
+    '''
+    Read-only view of one record of an AGMABatch, with the attributes and
+    methods of models.agma_results.AGMA
+
+    record: numpy.void record of dtype AGMA_DTYPE
+    '''
+    self.record = record
+
+  def __getattr__(self, name):
+    if (name in FIELDS):
+      return self.record[name].item()
+    raise AttributeError(name)
+
+  safety_factor = AGMA.safety_factor
+  valid_safety = AGMA.valid_safety
+  valid_velocity = AGMA.valid_velocity
+  valid = AGMA.valid
+  print = AGMA.print
+
+class AGMABatch:
+  def __init__(self, J, I, Cp, Kv, Ko, Cf, Ks, Km, Ch, Yn, Zn, Kr, Kt, Kb, Wt, Wr, sigma, sigma_all_bending, sigma_c, sigma_all_c, Sf, Sh, exceeded):
+    '''
+    Initialize AGMA batch object containing analysis results for many pairs
+
+    Same fields as models.agma_results.AGMA, stored in one structured
+    array (dtype AGMA_DTYPE) of the common result shape (pinions x gears
+    for a cross product, pairs for aligned pinion/gear arrays). Fields
+    are read as attributes, e.g. batch.Sf. Factors that could not be
+    evaluated (out of range tables) are NaN.
+    '''
+    fields = np.broadcast_arrays(J, I, Cp, Kv, Ko, Cf, Ks, Km, Ch, Yn, Zn, Kr, Kt, Kb, Wt, Wr, sigma, sigma_all_bending, sigma_c, sigma_all_c, Sf, Sh, exceeded)
+
+    self.data = np.empty(fields[0].shape, dtype=AGMA_DTYPE)
+    for name, values in zip(FIELDS, fields):
+      self.data[name] = values
+
+  @classmethod
+  def from_records(cls, data):
+    '''
+    return an AGMABatch wrapping an existing AGMA_DTYPE array
+    '''
+    batch = cls.__new__(cls)
+    batch.data = data
+    return batch
+
+  @classmethod
+  def stack(cls, pinion, gear):
+    '''
+    return the pinion and gear results of the same pairs as one batch with
+    a trailing member axis, row [..., 0] for the pinion and [..., 1] for the
+    gear
+
+    pinion, gear: AGMABatch of the same shape
+    '''
+    return cls.from_records(np.stack([pinion.data, gear.data], axis=-1))
+
+  def __getattr__(self, name):
+    if (name in FIELDS):
+      return self.data[name]
+    raise AttributeError(name)
+
+  @property
+  def shape(self):
+    return self.data.shape
+
+  @property
+  def nbytes(self):
+    return self.data.nbytes
+
+  def __len__(self):
+    return self.shape[0]
+
+  def __getitem__(self, i):
+    '''
+    return the AGMARow of a single result, or an AGMABatch of a selection
+    (slice, index array or boolean mask)
+    '''
+    data = self.data[i]
+    if (isinstance(data, np.void)):
+      return AGMARow(data)
+    return AGMABatch.from_records(data)
+
+  def filter(self, mask):
+    '''
+    return the AGMABatch of the results where mask is True, flattened
+    '''
+    return AGMABatch.from_records(self.data[mask])
+
+  def safety_factor(self):
+    '''
+    return the minimum safety factor of every pair
+    '''
+    return np.minimum(self.data['Sf'], self.data['Sh'])
+
+  def valid_safety(self, thresh):
+    '''
+    Return True where the safety factor is above a certain threshold
+    '''
+    return self.safety_factor() >= thresh
+
+  def valid_velocity(self):
+    return ~self.data['exceeded']
+
+  def valid(self, thresh):
+    return self.valid_safety(thresh) & self.valid_velocity()
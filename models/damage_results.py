@@ -0,0 +1,34 @@
+import numpy as np
+
+class DamageResults:
+  def __init__(self, bending, contact, exceeded):
+    '''
+    Initialize cumulative damage results of a load spectrum (Miner's rule)
+
+    bending: cumulative bending fatigue damage
+    contact: cumulative contact (pitting) damage
+    exceeded: True where the recommended velocity is exceeded in any bin
+    A damage of 1 or more means failure within the spectrum life.
+    '''
+    self.bending = bending
+    self.contact = contact
+    self.exceeded = exceeded
+
+  def damage(self):
+    '''
+    return the larger of the bending and contact damages
+    '''
+    return np.maximum(self.bending, self.contact)
+
+  def valid(self):
+    '''
+    Return True where the spectrum is survived without exceeding the
+    recommended velocity
+    '''
+    return (self.damage() <= 1) & ~self.exceeded
+
+  def print(self):
+    print("Load Spectrum Damage Results \n\n")
+    print("Bending Damage: ", self.bending)
+    print("Contact Damage: ", self.contact)
+    print("Velocity Exceeded: ", self.exceeded)
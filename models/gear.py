@@ -1,4 +1,6 @@
 class Gear:
+  __slots__ = ('mod', 'N', 'dp', 'bore', 'F', 'E', 'v', 'H', 'weight', 'Qv')
+
   def __init__(self, module, number_of_teeth, pitch_diameter, bore, face_width, E, v, H, Qv, weight=0):
     '''
     module: gear module (mm or in)
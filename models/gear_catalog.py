@@ -0,0 +1,107 @@
+from functools import cached_property
+import numpy as np
+from models.gear import Gear
+
+# Column name, Gear constructor argument and dtype (None: integer source
+# values stay integers, as for Gear objects built with an integer module)
+COLUMNS = (
+  ('mod', 'module', None),
+  ('N', 'number_of_teeth', np.int32),
+  ('dp', 'pitch_diameter', np.float64),
+  ('bore', 'bore', np.float64),
+  ('F', 'face_width', np.float64),
+  ('E', 'E', np.float64),
+  ('v', 'v', np.float64),
+  ('H', 'H', np.float64),
+  ('Qv', 'Qv', np.float64),
+  ('weight', 'weight', np.float64),
+)
+
+class GearCatalog:
+  def __init__(self, module, number_of_teeth, pitch_diameter, bore, face_width, E, v, H, Qv, weight=0):
+    '''
+    Initialize a columnar gear catalog, one typed array per Gear attribute
+
+    Arguments are as for models.gear.Gear, given as arrays (scalars are
+    broadcast to the catalog length). Columns are exposed under the Gear
+    attribute names: mod, N, dp, bore, F, E, v, H, Qv, weight.
+    '''
+    values = (module, number_of_teeth, pitch_diameter, bore, face_width, E, v, H, Qv, weight)
+    size = max(np.size(value) for value in values)
+
+    # Source Gear objects of each row, see from_gears
+    self.gears = None
+
+    for (name, _, dtype), value in zip(COLUMNS, values):
+      if (dtype is None):
+        dtype = np.int64 if np.asarray(value).dtype.kind in 'iub' else np.float64
+      column = np.asarray(value, dtype=dtype)
+      if (column.ndim == 0):
+        column = np.full(size, column, dtype=dtype)
+      setattr(self, name, column)
+
+  @classmethod
+  def from_gears(cls, gears):
+    '''
+    Build a catalog from a sequence of Gear objects
+
+    Rows of the catalog are the given Gear objects, not copies.
+    '''
+    gears = list(gears)
+    catalog = cls(**{arg: [getattr(gear, name) for gear in gears] for name, arg, _ in COLUMNS})
+    catalog.gears = np.empty(len(gears), dtype=object)
+    catalog.gears[:] = gears
+    return catalog
+
+  @property
+  def columns(self):
+    '''
+    dict of the catalog columns keyed by Gear attribute name
+    '''
+    return {name: getattr(self, name) for name, _, _ in COLUMNS}
+
+  @property
+  def nbytes(self):
+    return sum(column.nbytes for column in self.columns.values())
+
+  @cached_property
+  def module_index(self):
+    '''
+    dict mapping each module to the ascending row indices of that module
+    '''
+    modules, inverse = np.unique(self.mod, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.cumsum(np.bincount(inverse, minlength=len(modules)))[:-1]
+    return dict(zip(modules.tolist(), np.split(order, bounds)))
+
+  def __len__(self):
+    return len(self.N)
+
+  def __getitem__(self, key):
+    '''
+    An integer returns that row as a Gear: the source Gear object of a
+    catalog built with from_gears, otherwise a new Gear holding a copy of
+    the row (writing to it does not change the catalog). A slice, boolean
+    mask or index array returns a GearCatalog of the selected rows.
+    '''
+    if (isinstance(key, (int, np.integer))):
+      if (self.gears is not None):
+        return self.gears[key]
+      return Gear(*(getattr(self, name)[key].item() for name, _, _ in COLUMNS))
+
+    catalog = GearCatalog(*(getattr(self, name)[key] for name, _, _ in COLUMNS))
+    if (self.gears is not None):
+      catalog.gears = self.gears[key]
+    return catalog
+
+  def __iter__(self):
+    for i in range(len(self)):
+      yield self[i]
+
+def as_catalog(gears):
+  '''
+  Returns gears as a GearCatalog, converting sequences of Gear objects
+  '''
+  if (isinstance(gears, GearCatalog)):
+    return gears
+  return GearCatalog.from_gears(gears)
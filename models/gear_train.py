@@ -0,0 +1,80 @@
+import numpy as np
+
+class GearStage:
+  __slots__ = ('pinion', 'gear', 'n', 'T', 'cycles', 'Sf', 'Sh')
+
+  def __init__(self, pinion, gear, n, T, cycles, Sf, Sh):
+    '''
+    Initialize a gear train stage
+
+    pinion: driving Gear
+    gear: driven Gear
+    n: pinion rotation speed (rpm)
+    T: pinion torque (N*m)
+    cycles: pinion number of load cycles
+    Sf: min Safety Factor in Bending of the pinion and gear
+    Sh: min Safety Factor in Shear of the pinion and gear
+    '''
+    self.pinion = pinion
+    self.gear = gear
+    self.n = n
+    self.T = T
+    self.cycles = cycles
+    self.Sf = Sf
+    self.Sh = Sh
+
+  def ratio(self):
+    '''
+    return the stage speed ratio Ng/Np
+    '''
+    return self.gear.N/self.pinion.N
+
+class GearTrain:
+  def __init__(self, stages):
+    '''
+    Initialize a gear train, stages ordered from the motor to the output
+
+    stages: list of GearStage
+    '''
+    self.stages = stages
+
+  def __len__(self):
+    return len(self.stages)
+
+  def gears(self):
+    '''
+    return [gear 1, gear 2, ...], pinion then gear of every stage
+    '''
+    return [g for stage in self.stages for g in (stage.pinion, stage.gear)]
+
+  def ratio(self):
+    '''
+    return the overall speed ratio, motor speed over output speed
+    '''
+    return float(np.prod([stage.ratio() for stage in self.stages]))
+
+  def geartrain_value(self):
+    '''
+    return the geartrain value e, output speed over motor speed
+    '''
+    return 1/self.ratio()
+
+  def safety_factor(self):
+    '''
+    return the minimum safety factor over every stage
+    '''
+    return min(min(stage.Sf, stage.Sh) for stage in self.stages)
+
+  def print(self):
+    print("Gear Train \n\n")
+    print("Number of Stages: ", len(self.stages))
+    print("Geartrain Value: ", self.geartrain_value())
+    for s, stage in enumerate(self.stages):
+      print("Stage ", s + 1, ": ")
+      print("  Module: ", stage.pinion.mod, "/", stage.gear.mod)
+      print("  Number of Teeth: ", stage.pinion.N, "/", stage.gear.N)
+      print("  Pinion Rotation Speed: ", stage.n, "rpm")
+      print("  Pinion Torque: ", stage.T, "N*m")
+      print("  Pinion Load Cycles: ", stage.cycles)
+      print("  Safety Factor in Bending: ", stage.Sf)
+      print("  Safety Factor in Shear: ", stage.Sh)
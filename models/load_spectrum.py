@@ -0,0 +1,44 @@
+import numpy as np
+
+class LoadSpectrum:
+  def __init__(self, speed, time, torque, life=300000, dtire=0.499):
+    '''
+    Initialize a duty spectrum, one bin per operating point of the driving
+    cycle, preprocessed once into output speeds and load cycles per bin
+
+    speed: vehicle speed of each bin (km/hr)
+    time: time spent in each bin per driving cycle (s)
+    torque: motor torque of each bin (N*m), scalar or one per bin
+    life: vehicle life (km)
+    dtire: tire diameter (m)
+    '''
+    speed, time, torque = np.broadcast_arrays(
+      np.asarray(speed, dtype=float), np.asarray(time, dtype=float), np.asarray(torque, dtype=float))
+
+    self.speed = speed.copy()
+    self.time = time.copy()
+    self.torque = torque.copy()
+    self.life = life
+    self.dtire = dtire
+
+    # Distance per driving cycle (km) and number of driving cycles
+    dist_per_bin = 1/3600*self.speed*self.time
+    self.N_cycles = life/dist_per_bin.sum()
+
+    # Geartrain output (wheel) rotation speed (rpm) and revolutions per bin
+    self.n = self.speed*1000/60*(1/(np.pi*dtire))
+    self.revolutions = self.N_cycles*1000/(np.pi*dtire)*dist_per_bin
+
+    for values in (self.speed, self.time, self.torque, self.n, self.revolutions):
+      values.setflags(write=False)
+
+  def __len__(self):
+    return len(self.speed)
+
+  def print(self):
+    print("Load Spectrum \n\n")
+    print("Vehicle Life: ", self.life, "km")
+    print("Driving Cycles: ", self.N_cycles)
+    print("Speed \t Time \t Torque \t Output Speed \t Revolutions")
+    for row in zip(self.speed, self.time, self.torque, self.n, self.revolutions):
+      print(*row, sep=" \t ")
@@ -0,0 +1,37 @@
+from models.search_report import SearchReport
+
+class PipelineStats:
+  def __init__(self):
+    '''
+    Initialize instrumentation counters of the AGMA pipeline
+
+    calls: dict of call counts keyed by function name
+    time: dict of cumulative wall time (s) keyed by function name, nested
+    calls are included in the time of their caller
+    report: SearchReport of the pair searches run while instrumented
+    '''
+    self.calls = {}
+    self.time = {}
+    self.report = SearchReport()
+
+  def record(self, name, seconds):
+    self.calls[name] = self.calls.get(name, 0) + 1
+    self.time[name] = self.time.get(name, 0) + seconds
+
+  def timings(self):
+    '''
+    return a list of (name, calls, time) sorted by decreasing time
+    '''
+    return sorted(((name, self.calls[name], self.time[name]) for name in self.calls), key=lambda t: -t[2])
+
+  def reset(self):
+    self.calls.clear()
+    self.time.clear()
+    self.report = SearchReport()
+
+  def print(self):
+    print("AGMA Pipeline Statistics \n\n")
+    for name, calls, seconds in self.timings():
+      print(name, ": ", calls, "calls, ", round(seconds, 6), "s, ", round(1e6*seconds/calls, 3), "us/call")
+    print("\n")
+    self.report.print()
@@ -0,0 +1,54 @@
+import numpy as np
+
+class ReliabilityResults:
+  def __init__(self, samples, bending, contact, exceeded, failed):
+    '''
+    Initialize Monte Carlo reliability results of pinion/gear pairs
+
+    Counts of failing samples per pair; member axis 0 is the pinion and 1
+    the gear.
+
+    samples: number of samples per pair, at least 1
+    bending: samples with Sf < 1, shape (pairs, 2)
+    contact: samples with Sh < 1, shape (pairs, 2)
+    exceeded: samples above the max recommended velocity, shape (pairs, 2)
+    failed: samples where the pinion or the gear fails in bending or
+    contact, shape (pairs,)
+    '''
+    if (samples < 1):
+      raise ValueError("samples must be at least 1, got " + str(samples))
+    self.samples = samples
+    self.bending = bending
+    self.contact = contact
+    self.exceeded = exceeded
+    self.failed = failed
+
+  def P_bending(self):
+    '''
+    return P(Sf < 1) of the pinion and the gear of every pair, (pairs, 2)
+    '''
+    return self.bending/self.samples
+
+  def P_contact(self):
+    '''
+    return P(Sh < 1) of the pinion and the gear of every pair, (pairs, 2)
+    '''
+    return self.contact/self.samples
+
+  def P_failure(self):
+    '''
+    return the probability that the pinion or the gear of every pair fails
+    in bending or contact
+    '''
+    return self.failed/self.samples
+
+  def reliability(self):
+    return 1 - self.P_failure()
+
+  def print(self):
+    print("Monte Carlo Reliability Results \n\n")
+    print("Samples per Pair: ", self.samples)
+    print("P(Sf < 1) Pinion, Gear: \n", self.P_bending())
+    print("P(Sh < 1) Pinion, Gear: \n", self.P_contact())
+    print("P(Velocity Exceeded) Pinion, Gear: \n", self.exceeded/self.samples)
+    print("Pair Reliability: \n", self.reliability())
@@ -0,0 +1,41 @@
+
+class SearchReport:
+  def __init__(self):
+    '''
+    Initialize counters for a gear pair search
+
+    considered: pinion x gear pairs considered
+    module: pairs removed because the modules do not match
+    reduction: pairs removed by the geartrain reduction check
+    interference: pairs removed by the interference check
+    feasible: pairs left for the AGMA analysis
+    evaluated: AGMA evaluations (pinion and gear checks count separately)
+    skipped: AGMA evaluations avoided by pruning
+    accepted: pairs passing the AGMA analysis
+    '''
+    self.considered = 0
+    self.module = 0
+    self.reduction = 0
+    self.interference = 0
+    self.feasible = 0
+    self.evaluated = 0
+    self.skipped = 0
+    self.accepted = 0
+
+  def merge(self, other):
+    '''
+    add the counters of another report, e.g. from a parallel chunk
+    '''
+    for name, value in vars(other).items():
+      setattr(self, name, getattr(self, name) + value)
+
+  def print(self):
+    print("Gear Pair Search Report \n\n")
+    print("Pairs Considered: ", self.considered)
+    print("Removed by Module Mismatch: ", self.module)
+    print("Removed by Reduction: ", self.reduction)
+    print("Removed by Interference: ", self.interference)
+    print("Feasible Pairs: ", self.feasible)
+    print("AGMA Evaluations: ", self.evaluated)
+    print("AGMA Evaluations Skipped: ", self.skipped)
+    print("Accepted Pairs: ", self.accepted)
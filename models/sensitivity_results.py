@@ -0,0 +1,35 @@
+import numpy as np
+
+# Parameters of the sensitivities, in Jacobian column order
+PARAMETERS = ('F', 'm', 'dp', 'dg', 'Hp', 'Hg', 'Qv', 'Tmotor', 'n')
+
+class Sensitivity:
+  def __init__(self, Sf, Sh, dSf, dSh):
+    '''
+    Initialize AGMA safety factors and their partial derivatives
+
+    Sf: Safety Factor in Bending
+    Sh: Safety Factor in Shear
+    dSf: dict of dSf/dx arrays keyed by parameter name (see PARAMETERS)
+    dSh: dict of dSh/dx arrays keyed by parameter name
+    '''
+    self.Sf = Sf
+    self.Sh = Sh
+    self.dSf = dSf
+    self.dSh = dSh
+
+  def jacobian(self):
+    '''
+    return the Jacobian of (Sf, Sh) with respect to PARAMETERS, shape
+    (..., 2, len(PARAMETERS))
+    '''
+    return np.stack([
+      np.stack([self.dSf[name] for name in PARAMETERS], axis=-1),
+      np.stack([self.dSh[name] for name in PARAMETERS], axis=-1)], axis=-2)
+
+  def print(self):
+    print("AGMA Sensitivities \n\n")
+    print("Safety Factor in Bending: ", self.Sf)
+    print("Safety Factor in Contact: ", self.Sh)
+    for name in PARAMETERS:
+      print("dSf/d" + name + ": ", self.dSf[name], ", dSh/d" + name + ": ", self.dSh[name])
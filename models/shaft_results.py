@@ -0,0 +1,72 @@
+import numpy as np
+
+class ShaftDiagrams:
+  def __init__(self, name, L, locations, x, T, Vx, Mx, Vy, My, Fr1_x, Fr1_y, Fr2_x, Fr2_y):
+    '''
+    Initialize the torque, shear and moment diagrams of a shaft
+
+    name: shaft name, e.g. 'Input' or 'Idler'
+    L: shaft length m
+    locations: dict of element positions along the shaft m, by element name
+    x: positions along the shaft m
+    T: torque N*m at x
+    Vx, Mx: shear N and bending moment N*m in the x-z plane (radial forces)
+    Vy, My: shear N and bending moment N*m in the y-z plane (tangential forces)
+    Fr1_x, Fr1_y: reaction forces on bearing 1 N
+    Fr2_x, Fr2_y: reaction forces on bearing 2 N
+    '''
+    self.name = name
+    self.L = L
+    self.locations = locations
+    self.x = x
+    self.T = T
+    self.Vx = Vx
+    self.Mx = Mx
+    self.Vy = Vy
+    self.My = My
+    self.Fr1_x = Fr1_x
+    self.Fr1_y = Fr1_y
+    self.Fr2_x = Fr2_x
+    self.Fr2_y = Fr2_y
+
+  @property
+  def Tmax(self):
+    return np.abs(self.T).max()
+
+  @property
+  def Mxmax(self):
+    return np.abs(self.Mx).max()
+
+  @property
+  def Mymax(self):
+    return np.abs(self.My).max()
+
+  @property
+  def Fr1_combined(self):
+    return np.sqrt(self.Fr1_x**2 + self.Fr1_y**2)
+
+  @property
+  def Fr2_combined(self):
+    return np.sqrt(self.Fr2_x**2 + self.Fr2_y**2)
+
+  @property
+  def Mmax_combined(self):
+    return np.sqrt(self.Mxmax**2 + self.Mymax**2)
+
+  def values(self):
+    '''
+    return (Fr1_combined, Fr2_combined, Mmax_combined, Tmax)
+    '''
+    return self.Fr1_combined, self.Fr2_combined, self.Mmax_combined, self.Tmax
+
+  def print(self):
+    print(self.name + " Shaft Length: ", self.L*1000, "mm")
+    names = list(self.locations)
+    for name in names[:-1]:
+      print(name + " Location: ", self.locations[name]*1000, "mm")
+    print(names[-1] + " Location: ", self.locations[names[-1]]*1000, "mm \n")
+
+    print("Fx on Bearing 1: ", self.Fr1_x, "N")
+    print("Fy on Bearing 1: ", self.Fr1_y, "N")
+    print("Fx on Bearing 2: ", self.Fr2_x, "N")
+    print("Fy on Bearing 2: ", self.Fr2_y, "N")
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Sweep axes, in the order of the result dimensions
+SWEEP_AXES = ('St', 'Sc', 'Tmotor', 'nmin', 'phi_t', 'thresh')
+
+class SweepResults:
+  def __init__(self, axes, count, best, worst, pairs):
+    '''
+    Initialize parameter sweep results
+
+    Every array has one dimension per sweep axis (see SWEEP_AXES), of the
+    length of the swept values.
+
+    axes: dict of the swept values, keyed by axis name
+    count: number of valid pairs per grid cell
+    best: max pair safety factor per grid cell (NaN when no pair is in range)
+    worst: min pair safety factor per grid cell (NaN when no pair is in range)
+    pairs: number of feasible pairs analyzed per phi_t value
+    '''
+    self.axes = axes
+    self.count = count
+    self.best = best
+    self.worst = worst
+    self.pairs = pairs
+    self.shape = count.shape
+
+  def squeeze(self, name: str = 'count'):
+    '''
+    return a result array without the axes swept over a single value
+    '''
+    return np.squeeze(getattr(self, name))
+
+  def cell(self, **values):
+    '''
+    return the (count, best, worst) of the grid cell closest to the given
+    axis values, e.g. cell(St=515, Sc=1895)
+    '''
+    index = tuple(
+      int(np.argmin(np.abs(self.axes[name] - values[name]))) if name in values else 0
+      for name in SWEEP_AXES
+    )
+    return self.count[index].item(), self.best[index].item(), self.worst[index].item()
+
+  def print(self):
+    print("Parameter Sweep Results \n\n")
+    for name in SWEEP_AXES:
+      print(name, ": ", self.axes[name])
+    print("Feasible Pairs: ", self.pairs)
+    print("Valid Pairs: \n", self.squeeze('count'))
+    print("Best Safety Factor: \n", self.squeeze('best'))
+    print("Worst Safety Factor: \n", self.squeeze('worst'))
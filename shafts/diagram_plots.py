@@ -0,0 +1,36 @@
+from matplotlib import pyplot as plt
+
+from models.shaft_results import ShaftDiagrams
+
+def plot_diagram(x, y, title, ylabel, label, loc, show=True):
+  '''
+  Returns the figure of one diagram along the shaft
+  '''
+  fig, ax = plt.subplots()
+  ax.set_xlabel(r'$x$ (position along the shaft, m)')
+  ax.set_ylabel(ylabel)
+  ax.set_title(title)
+  ax.plot(x, y, label=label)
+  ax.legend(loc=loc)
+  fig.tight_layout()
+  if (show == True):
+    plt.show()
+  return fig
+
+def plot_diagrams(diagrams: ShaftDiagrams, show=True):
+  '''
+  Plot the torque diagram and the shear and moment diagrams of both planes
+  of a shaft, returns the list of figures
+
+  diagrams: ShaftDiagrams, e.g. from shafts.diagrams.input_shaft
+  show: call plt.show() after each figure
+  '''
+  x = diagrams.x
+  name = diagrams.name + ' Shaft '
+  return [
+    plot_diagram(x, diagrams.T, name + 'Torque Diagram', r'$y$ (Torque N*m)', 'Torque', 'upper left', show),
+    plot_diagram(x, diagrams.Vx, name + 'x-z Plane Shear Diagram', r'$y$ (Shear in x-z plane N)', 'Shear', 'upper right', show),
+    plot_diagram(x, diagrams.Mx, name + 'x-z Plane Moment Diagram', r'$y$ (Moment in x-z plane N*m)', 'Bending Moment', 'upper left', show),
+    plot_diagram(x, diagrams.Vy, name + 'x-y Plane Shear Diagram', r'$y$ (x-y Plane Shear N)', 'Shear Force', 'upper right', show),
+    plot_diagram(x, diagrams.My, name + 'y-z Plane Moment Diagram', r'$y$ (y-z plane Moment N*m)', 'Bending Moment', 'upper left', show),
+  ]
@@ -1,10 +1,25 @@
-from matplotlib import pyplot as plt
 import numpy as np
-from scipy.integrate import cumulative_trapezoid as ct
 
-def input_diagrams(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h=0.0005):
+from models.shaft_results import ShaftDiagrams
+
+def ct(y, x):
+  '''
+  Returns the cumulative trapezoidal integral of y over x, starting at 0
+  (scipy.integrate.cumulative_trapezoid with initial=0, in NumPy so the
+  compute core has no SciPy dependency)
+  '''
+  return np.concatenate(([0.0], np.cumsum((y[1:] + y[:-1])*np.diff(x)/2)))
+
+def locate(length, position):
+  '''
+  Returns the index of position on the grid length
   '''
-  Generate the Torque, shear and moment diagrams for an input shaft
+  return np.where(np.isclose(length, position))[0][0]
+
+def input_shaft(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h=0.0005):
+  '''
+  Returns the ShaftDiagrams (torque, shear and moment) of an input shaft,
+  without printing or plotting
   Input shaft must be configured in the following way:
     Spline -- Bearing -- Gear -- Bearing
 
@@ -15,7 +30,7 @@ def input_diagrams(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h=0.0005):
   dg1: diameter of 2nd gear in the train, m
   Wtg1: Tangential Force on G2, N
   Wrg1: Radial Force on G2, N
-  h: step size
+  h: step size, the elements must fall on the grid
   '''
 
   # Torque
@@ -25,123 +40,52 @@ def input_diagrams(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h=0.0005):
   L = w_bear + dele + w_gear + dele + w_bear + 2*dele + w_motor
   length = np.arange(0, L+h, h)
 
-  print("Input Shaft Length: ", L*1000, "mm")
-
   i_motor = w_motor/2
-  i_bear1 = w_motor + 2*dele + w_bear/2  
+  i_bear1 = w_motor + 2*dele + w_bear/2
   i_gear1 = w_motor + 2*dele + w_bear + dele + w_gear/2
   i_bear2 = w_motor + 2*dele + w_bear + dele + w_gear + dele + w_bear/2
 
-  print("Motor Coupling Location: ", i_motor*1000, "mm")
-  print("Bearing 1 Location: ", i_bear1*1000, "mm")
-  print("Gear 1 Location: ", i_gear1*1000, "mm")
-  print("Bearing 2 Location: ", i_bear2*1000, "mm \n")
-
   # Reaction Forces
   Fr2_x = (Wrg1*(i_gear1 - i_bear1))/(i_bear2 - i_bear1)
   Fr2_y = (Wtg1*(i_gear1 - i_bear1))/(i_bear2 - i_bear1)
   Fr1_x = Wrg1 - Fr2_x
   Fr1_y = Wtg1 - Fr2_y
 
-  print("Fx on Bearing 1: ", Fr1_x, "N")
-  print("Fy on Bearing 1: ", Fr1_y, "N")
-  print("Fx on Bearing 2: ", Fr2_x, "N")
-  print("Fy on Bearing 2: ", Fr2_y, "N")
-
-  i = np.where(np.isclose(length, i_motor))[0][0]
-  j = np.where(np.isclose(length, i_gear1))[0][0]
-  k = np.where(np.isclose(length, i_bear1))[0][0]
-  l = np.where(np.isclose(length, i_bear2))[0][0]
+  i = locate(length, i_motor)
+  j = locate(length, i_gear1)
+  k = locate(length, i_bear1)
+  l = locate(length, i_bear2)
   x = np.array(length)
 
   # Torque Diagram
-  y = np.zeros((length.shape[0]))
-  y[i:j] = Tg1
-
-  # plot
-  Tdiag, ax_t = plt.subplots()
-  ax_t.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_t.set_ylabel(r'$y$ (Torque N*m)')
-  ax_t.set_title(r'Input Shaft Torque Diagram')
-  ax_t.plot(x, y, label='Torque')
-  ax_t.legend(loc='upper left')
-  Tdiag.tight_layout()
-  plt.show()
-
-  Tmax = np.abs(y).max()
+  T = np.zeros((length.shape[0]))
+  T[i:j] = Tg1
 
   # Shear & Moment Diagrams
   # x-z plane
-  y = np.zeros((length.shape[0]))
-  y[k:j] = Fr1_x
-  y[j:l] = Fr1_x - Wrg1
-  y[l:] = Fr1_x - Wrg1 + Fr2_x
-
-  # plot
-  Vdiag1, ax_Vx = plt.subplots()
-  ax_Vx.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_Vx.set_ylabel(r'$y$ (Shear in x-z plane N)')
-  ax_Vx.set_title(r'Input Shaft x-z Plane Shear Diagram')
-  ax_Vx.plot(x, y, label='Shear')
-  ax_Vx.legend(loc='upper right')
-  Vdiag1.tight_layout()
-  plt.show()
-
-  y = ct(y, x, initial=0)
-
-  # plot
-  Mdiag1, ax_Mx = plt.subplots()
-  ax_Mx.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_Mx.set_ylabel(r'$y$ (Moment in x-z plane N*m)')
-  ax_Mx.set_title(r'Input Shaft x-z Plane Moment Diagram')
-  ax_Mx.plot(x, y, label='Bending Moment')
-  ax_Mx.legend(loc='upper left')
-  Mdiag1.tight_layout()
-  plt.show()
-
-  Mxmax = np.abs(y).max()
+  Vx = np.zeros((length.shape[0]))
+  Vx[k:j] = Fr1_x
+  Vx[j:l] = Fr1_x - Wrg1
+  Vx[l:] = Fr1_x - Wrg1 + Fr2_x
+  Mx = ct(Vx, x)
 
-  # x-y plane
-  y = np.zeros((length.shape[0]))
-  y[k:j] = Fr1_y
-  y[j:l] = Fr1_y - Wtg1
-  y[l:] = Fr1_y - Wtg1 + Fr2_y
-
-  # plot
-  Vdiag2, ax_Vy = plt.subplots()
-  ax_Vy.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_Vy.set_ylabel(r'$y$ (x-y Plane Shear N)')
-  ax_Vy.set_title(r'Input Shaft x-y Plane Shear Diagram')
-  ax_Vy.plot(x, y, label='Shear Force')
-  ax_Vy.legend(loc='upper right')
-  Vdiag2.tight_layout()
-  plt.show()
-
-  y = ct(y, x, initial=0)
-
-  # plot
-  Mdiag2, ax_My = plt.subplots()
-  ax_My.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_My.set_ylabel(r'$y$ (y-z plane Moment N*m)')
-  ax_My.set_title(r'Input Shaft y-z Plane Moment Diagram')
-  ax_My.plot(x, y, label='Bending Moment')
-  ax_My.legend(loc='upper left')
-  Mdiag2.tight_layout()
-  plt.show()
-
-  Mymax = np.abs(y).max()
+  # y-z plane
+  Vy = np.zeros((length.shape[0]))
+  Vy[k:j] = Fr1_y
+  Vy[j:l] = Fr1_y - Wtg1
+  Vy[l:] = Fr1_y - Wtg1 + Fr2_y
+  My = ct(Vy, x)
 
-  Fr1_combined = np.sqrt(Fr1_x**2 + Fr1_y**2)
-  Fr2_combined = np.sqrt(Fr2_x**2 + Fr2_y**2)
-  Mmax_combined = np.sqrt(Mxmax**2 + Mymax**2)
-  return Fr1_combined, Fr2_combined, Mmax_combined, Tmax
+  locations = {'Motor Coupling': i_motor, 'Bearing 1': i_bear1, 'Gear 1': i_gear1, 'Bearing 2': i_bear2}
+  return ShaftDiagrams('Input', L, locations, x, T, Vx, Mx, Vy, My, Fr1_x, Fr1_y, Fr2_x, Fr2_y)
 
-def idler_diagrams(dele, w_gear, w_bear, dg2, Wtg2, Wrg2, dg3, Wtg3, Wrg3, h=0.0005):
+def idler_shaft(dele, w_gear, w_bear, dg2, Wtg2, Wrg2, dg3, Wtg3, Wrg3, h=0.0005):
   '''
-  Generate the Torque, shear and moment diagrams for a idler shaft
-  Shaft must be configured as follows: 
+  Returns the ShaftDiagrams (torque, shear and moment) of an idler shaft,
+  without printing or plotting
+  Shaft must be configured as follows:
     Bearing -- Gear -- Gear -- Bearing
-    
+
   dele: distance between the elements , m
   w_gear: face width of the gear
   w_bear: width of the bearing
@@ -151,133 +95,86 @@ def idler_diagrams(dele, w_gear, w_bear, dg2, Wtg2, Wrg2, dg3, Wtg3, Wrg3, h=0.0
   dg3: diameter of 3rd gear in the train, pinion for output, m
   Wtg3: Tangential Force on G3, N
   Wrg3: Radial Force on G3, N
-  h: step size
+  h: step size, the elements must fall on the grid
   '''
   # Torque
   Tg2 = Wtg2*dg2/2
   Tg3 = Wtg3*dg3/2
-  
+
   # Locate Elements
   L = w_bear + dele + w_gear + dele + w_gear + dele + w_bear
-  print("Idler Shaft Length: ", L*1000, "mm" )
   length = np.arange(0, L+h, h)
-  
+
   # bearings
   i_bear1 = w_bear/2
   i_bear2 = L - w_bear/2
-  
 
-  # gears 
-  i_gear2 = w_bear + dele + w_gear/2 
+  # gears
+  i_gear2 = w_bear + dele + w_gear/2
   i_gear3 = L - w_bear - dele - w_gear/2
 
-  print("Bearing 1 Location: ", i_bear1*1000, "mm")
-  print("Gear 2 Location: ", i_gear2*1000, "mm")
-  print("Gear 3 Location: ", i_gear3*1000, "mm")
-  print("Gear 4 Location: ", i_bear2*1000, "mm \n")
-
   # Reaction Forces
   Fr2_x = (Wrg2*(i_gear2-i_bear1) + Wrg3*(i_gear3-i_bear1))/(i_bear2-i_bear1)
   Fr2_y = (Wtg2*(i_gear2 - i_bear1) + Wtg3*(i_gear3 - i_bear1))/(i_bear2 - i_bear1)
   Fr1_x = Wrg2 + Wrg3 - Fr2_x
   Fr1_y = Wtg2 + Wtg3 - Fr2_y
 
-  print("Fx on Bearing 1: ", Fr1_x, "N")
-  print("Fy on Bearing 1: ", Fr1_y, "N")
-  print("Fx on Bearing 2: ", Fr2_x, "N")
-  print("Fy on Bearing 2: ", Fr2_y, "N")
-
   # Indices
-  i = np.where(np.isclose(length, i_gear2))[0][0]
-  j = np.where(np.isclose(length, i_gear3))[0][0]
-  k = np.where(np.isclose(length, i_bear1))[0][0]
-  l = np.where(np.isclose(length, i_bear2))[0][0]
+  i = locate(length, i_gear2)
+  j = locate(length, i_gear3)
+  k = locate(length, i_bear1)
+  l = locate(length, i_bear2)
   x = np.array(length)
 
-  # Torque Diagram 
-  y = np.zeros((length.shape[0]))
-  y[i:j] = Tg2
-  y[j:] =  Tg2-Tg3
-
-  # plot
-  Tdiag, ax_t = plt.subplots()
-  ax_t.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_t.set_ylabel(r'$y$ (Torque N*m)')
-  ax_t.set_title(r'Idler Shaft Torque Diagram')
-  ax_t.plot(x, y, label='Torque')
-  ax_t.legend(loc='upper left')
-  Tdiag.tight_layout()
-  plt.show()
-
-  Tmax = np.abs(y).max()
-
+  # Torque Diagram
+  T = np.zeros((length.shape[0]))
+  T[i:j] = Tg2
+  T[j:] = Tg2-Tg3
 
   # Shear & Moment Diagrams
   # x-z plane
-  y = np.zeros((length.shape[0]))
-  y[k:i] = Fr1_x
-  y[i:j] = Fr1_x - Wrg2
-  y[j:l] = Fr1_x - Wrg2 - Wrg3
-  y[l:] =  Fr1_x - Wrg2 - Wrg3 + Fr2_x
-
-  # plot
-  Vdiag1, ax_Vx = plt.subplots()
-  ax_Vx.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_Vx.set_ylabel(r'$y$ (Shear in x-z plane N)')
-  ax_Vx.set_title(r'Idler Shaft x-z Plane Shear Diagram')
-  ax_Vx.plot(x, y, label='Shear')
-  ax_Vx.legend(loc='upper right')
-  Vdiag1.tight_layout()
-  plt.show()
-
-  y = ct(y, x, initial=0)
-
-  # plot
-  Mdiag1, ax_Mx = plt.subplots()
-  ax_Mx.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_Mx.set_ylabel(r'$y$ (Moment in x-z plane N*m)')
-  ax_Mx.set_title(r'Idler Shaft x-z Plane Moment Diagram')
-  ax_Mx.plot(x, y, label='Bending Moment')
-  ax_Mx.legend(loc='upper left')
-  Mdiag1.tight_layout()
-  plt.show()
-
-  Mxmax = np.abs(y).max()
-
+  Vx = np.zeros((length.shape[0]))
+  Vx[k:i] = Fr1_x
+  Vx[i:j] = Fr1_x - Wrg2
+  Vx[j:l] = Fr1_x - Wrg2 - Wrg3
+  Vx[l:] = Fr1_x - Wrg2 - Wrg3 + Fr2_x
+  Mx = ct(Vx, x)
 
   # y-z plane
-  y = np.zeros((length.shape[0]))
-  y[k:i] = Fr1_y
-  y[i:j] = Fr1_y - Wtg2
-  y[j:l] = Fr1_y - Wtg2 - Wtg3
-  y[l:] =  Fr1_y - Wtg2 - Wtg3 + Fr2_y
+  Vy = np.zeros((length.shape[0]))
+  Vy[k:i] = Fr1_y
+  Vy[i:j] = Fr1_y - Wtg2
+  Vy[j:l] = Fr1_y - Wtg2 - Wtg3
+  Vy[l:] = Fr1_y - Wtg2 - Wtg3 + Fr2_y
+  My = ct(Vy, x)
 
-  # plot
-  Vdiag2, ax_Vy = plt.subplots()
-  ax_Vy.set_xlabel(r'$x$ (position along the shaft, m')
-  ax_Vy.set_ylabel(r'$y$ (x-y Plane Shear N)')
-  ax_Vy.set_title(r'Idler Shaft x-y Plane Shear Diagram')
-  ax_Vy.plot(x, y, label='Shear Force')
-  ax_Vy.legend(loc='upper right')
-  Vdiag2.tight_layout()
-  plt.show()
+  locations = {'Bearing 1': i_bear1, 'Gear 2': i_gear2, 'Gear 3': i_gear3, 'Bearing 2': i_bear2}
+  return ShaftDiagrams('Idler', L, locations, x, T, Vx, Mx, Vy, My, Fr1_x, Fr1_y, Fr2_x, Fr2_y)
 
-  y = ct(y, x, initial=0)
+def input_diagrams(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h=0.0005):
+  '''
+  Print and plot the Torque, shear and moment diagrams for an input shaft,
+  see input_shaft. Plotting requires matplotlib (shafts.diagram_plots).
 
-  # plot
-  Mdiag2, ax_My = plt.subplots()
-  ax_My.set_xlabel(r'$x$ (position along the shaft, m)')
-  ax_My.set_ylabel(r'$y$ (y-z plane Moment N*m)')
-  ax_My.set_title(r'Idler Shaft y-z Plane Moment Diagram')
-  ax_My.plot(x, y, label='Bending Moment')
-  ax_My.legend(loc='upper left')
-  Mdiag2.tight_layout()
-  plt.show()
+  Returns (Fr1_combined, Fr2_combined, Mmax_combined, Tmax)
+  '''
+  from shafts.diagram_plots import plot_diagrams
 
-  Mymax = np.abs(y).max()
+  diagrams = input_shaft(dele, w_gear, w_bear, w_motor, dg1, Wtg1, Wrg1, h)
+  diagrams.print()
+  plot_diagrams(diagrams)
+  return diagrams.values()
 
-  Fr1_combined = np.sqrt(Fr1_x**2 + Fr1_y**2)
-  Fr2_combined = np.sqrt(Fr2_x**2 + Fr2_y**2)
-  Mmax_combined = np.sqrt(Mxmax**2 + Mymax**2)
+def idler_diagrams(dele, w_gear, w_bear, dg2, Wtg2, Wrg2, dg3, Wtg3, Wrg3, h=0.0005):
+  '''
+  Print and plot the Torque, shear and moment diagrams for an idler shaft,
+  see idler_shaft. Plotting requires matplotlib (shafts.diagram_plots).
+
+  Returns (Fr1_combined, Fr2_combined, Mmax_combined, Tmax)
+  '''
+  from shafts.diagram_plots import plot_diagrams
 
-  return Fr1_combined, Fr2_combined, Mmax_combined, Tmax
+  diagrams = idler_shaft(dele, w_gear, w_bear, dg2, Wtg2, Wrg2, dg3, Wtg3, Wrg3, h)
+  diagrams.print()
+  plot_diagrams(diagrams)
+  return diagrams.values()
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+import data.gearsdata as gd
+from gears.agma import agma
+from gears.agma_batch import agma_batch
+from gears.join import module_pairs
+
+@pytest.mark.parametrize('arg', ['metric', 'us'])
+@pytest.mark.parametrize('index', [1, 2, 3, 4])
+def test_batch_matches_scalar(arg, index):
+  pinions = gd.SpurPinion
+  gears = gd.SpurGear
+  ip, ig = module_pairs(pinions, gears)
+  R = 0.41 if index == 1 or index == 3 else 0.45
+
+  batch = agma_batch(R, pinions[ip], gears[ig], 70.2, 172, 515, 1895, index, arg=arg, cross=False)
+
+  for j, (p, g) in enumerate(zip(ip.tolist(), ig.tolist())):
+    try:
+      scalar = agma(R, pinions[p], gears[g], 70.2, 172, 515, 1895, index, arg=arg)
+    except TypeError:
+      # Face width out of the load distribution range, NaN in the batch
+      assert np.isnan(batch.Km[j])
+      continue
+
+    for name in ('Kv', 'Ks', 'Km', 'Ch', 'Yn', 'Zn', 'Wt', 'Sf', 'Sh'):
+      np.testing.assert_allclose(getattr(batch, name)[j], getattr(scalar, name), rtol=1e-12, err_msg=name)
+    assert batch.exceeded[j] == scalar.exceeded
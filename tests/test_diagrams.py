@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+import shafts.diagrams as sd
+
+dele = 10/1000
+w_gear = 50/1000
+w_bear = 21/1000
+w_motor = (31.1 - 10 - 6.1)/1000
+
+def shafts(h):
+  return (
+    sd.input_shaft(dele, w_gear, w_bear, w_motor, 150/1000, 2293.3, 837.7, h=h),
+    sd.idler_shaft(dele, w_gear, w_bear, 350/1000, 2293.33, 837.7, 175/1000, 4586.66, 1669.40, h=h),
+  )
+
+@pytest.mark.parametrize('h', [5e-4, 2.5e-4, 1e-4])
+def test_moments_match_scipy(h):
+  integrate = pytest.importorskip('scipy.integrate')
+  for diagrams in shafts(h):
+    np.testing.assert_allclose(diagrams.Mx, integrate.cumulative_trapezoid(diagrams.Vx, diagrams.x, initial=0), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(diagrams.My, integrate.cumulative_trapezoid(diagrams.Vy, diagrams.x, initial=0), rtol=1e-12, atol=1e-12)
+
+def test_headless_imports():
+  # The compute core, the result cache and the benchmarks need neither
+  # SciPy nor matplotlib
+  code = (
+    "import sys, shafts.diagrams, data.result_cache, benchmarks.suite\n"
+    "assert 'scipy' not in sys.modules and 'matplotlib' not in sys.modules, sorted(sys.modules)\n"
+  )
+  subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
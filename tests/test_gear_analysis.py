@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+
+import data.gearsdata as gd
+from gears.gear_analysis import METHODS, accepted_pairs, best_combinations, iter_combinations, run_analysis
+from models.search_report import SearchReport
+
+St = 515
+Sc = 1895
+nmin = 110*1000/60*(1/(np.pi*0.499))
+
+def pairs(combinations):
+  return [(p.mod, p.N, g.N) for p, g in combinations]
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('index', [2, 4])
+@pytest.mark.parametrize('Tmotor', [60, 172])
+def test_methods_match_loop(method, index, Tmotor):
+  loop = accepted_pairs(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, Tmotor, index, 'loop')
+  result = accepted_pairs(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, Tmotor, index, method)
+
+  np.testing.assert_array_equal(result[0], loop[0])
+  np.testing.assert_array_equal(result[1], loop[1])
+
+def test_prune_skips_evaluations():
+  loop = SearchReport()
+  prune = SearchReport()
+  accepted_pairs(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, 'loop', loop)
+  accepted_pairs(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, 'prune', prune)
+
+  assert prune.accepted == loop.accepted
+  assert prune.evaluated + prune.skipped == loop.evaluated
+
+def test_run_analysis_returns_catalog_gears():
+  combinations = run_analysis(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4)
+
+  assert len(combinations) > 0
+  assert all(isinstance(p.mod, int) for p, _ in combinations)
+  assert any(p is gd.p42 for p, _ in combinations)
+
+def test_parallel_matches_serial():
+  serial = run_analysis(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4)
+  with ThreadPoolExecutor(2) as executor:
+    parallel = run_analysis(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, executor=executor, workers=2)
+
+  assert pairs(parallel) == pairs(serial)
+
+@pytest.mark.parametrize('method', ['loop', 'prune'])
+def test_iter_combinations_matches_run_analysis(method):
+  expected = run_analysis(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4)
+  found = [(p, g) for p, g, _, _ in iter_combinations(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, method=method)]
+
+  assert pairs(found) == pairs(expected)
+
+def test_best_combinations_is_head_of_full_sort():
+  found = [(p, g, min(vp.safety_factor(), vg.safety_factor()))
+           for p, g, vp, vg in iter_combinations(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4)]
+  expected = sorted(found, key=lambda pair: -pair[2])[:5]
+
+  combinations, scores = best_combinations(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, k=5)
+
+  assert pairs(combinations) == pairs([(p, g) for p, g, _ in expected])
+  np.testing.assert_allclose(scores, [s for _, _, s in expected])
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_best_combinations_rejects_k(k):
+  with pytest.raises(ValueError):
+    best_combinations(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, k=k)
+
+def test_unknown_method():
+  with pytest.raises(ValueError):
+    run_analysis(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, method='bogus')
+  with pytest.raises(ValueError):
+    next(iter_combinations(gd.SpurPinion, gd.SpurGear, St, Sc, nmin, 172, 4, method='batch'))
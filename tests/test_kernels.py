@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+import data.gearsdata as gd
+from gears.join import module_pairs
+from gears.kernels import kernel_safety
+
+@pytest.mark.parametrize('arg', ['metric', 'us'])
+@pytest.mark.parametrize('index', [1, 2, 3, 4])
+def test_python_kernel_matches_batch(arg, index):
+  ip, ig = module_pairs(gd.SpurPinion, gd.SpurGear)
+  pinions = gd.SpurPinion[ip]
+  gears = gd.SpurGear[ig]
+
+  kernel = kernel_safety(0.41, pinions, gears, 70.2, 172, 515, 1895, index, arg=arg, backend='python')
+  batch = kernel_safety(0.41, pinions, gears, 70.2, 172, 515, 1895, index, arg=arg, backend='numpy')
+
+  np.testing.assert_allclose(kernel[0], batch[0], rtol=1e-12)
+  np.testing.assert_allclose(kernel[1], batch[1], rtol=1e-12)
+  np.testing.assert_array_equal(kernel[2], batch[2])
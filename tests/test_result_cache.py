@@ -0,0 +1,49 @@
+import pickle
+import numpy as np
+import pytest
+
+import data.gearsdata as gd
+from data.result_cache import ResultCache, cached_run_analysis, cached_idler_shaft, cached_spline_analysis
+from models.spline import Spline
+
+def test_gear_containers_share_a_key(tmp_path):
+  cache = ResultCache(tmp_path)
+  gears = list(gd.SpurPinion)
+  array = np.empty(len(gears), dtype=object)
+  array[:] = gears
+
+  keys = {cache.key('pinions', {'pinions': pinions}) for pinions in (gd.SpurPinion, gears, tuple(gears), array)}
+  assert len(keys) == 1
+
+def test_cached_run_analysis_hits_on_equivalent_inputs(tmp_path):
+  cache = ResultCache(tmp_path)
+  first = cached_run_analysis(cache, gd.SpurPinion, gd.SpurGear, 515, 1895, 70.2, 172, 4)
+  second = cached_run_analysis(cache, list(gd.SpurPinion), list(gd.SpurGear), 515, 1895, 70.2, 172, 4)
+
+  assert (cache.hits, cache.misses) == (1, 1)
+  assert [(p.N, g.N) for p, g in first] == [(p.N, g.N) for p, g in second]
+
+def test_results_round_trip(tmp_path):
+  cache = ResultCache(tmp_path)
+  args = (10/1000, 50/1000, 21/1000, 350/1000, 2293.33, 837.7, 175/1000, 4586.66, 1669.40)
+  spline = Spline(1, 24, 24, 25, 22.5, 35, 15, 30)
+
+  stored = (cached_idler_shaft(cache, *args), cached_spline_analysis(cache, spline, T=172, n=6367.143))
+  loaded = (cached_idler_shaft(cache, *args), cached_spline_analysis(cache, spline, T=172, n=6367.143))
+
+  assert (cache.hits, cache.misses) == (2, 2)
+  for a, b in zip(stored, loaded):
+    assert type(a) is type(b)
+    assert vars(a).keys() == vars(b).keys()
+    for name in vars(a):
+      np.testing.assert_array_equal(getattr(a, name), getattr(b, name))
+
+def test_pickled_entries_are_not_loaded(tmp_path):
+  cache = ResultCache(tmp_path)
+  key = cache.key('value', {})
+  cache.put(key, (np.arange(3), 1.5))
+  with open(cache.path(key), 'wb') as f:
+    pickle.dump((np.arange(3), 1.5), f)
+
+  with pytest.raises(KeyError):
+    cache.get(key)